@@ -1,18 +1,27 @@
 # server/app_mcp_demo.py
 
+import asyncio
 from fastapi import FastAPI
 from fastmcp import FastMCP
 from typing import Optional
-from datetime import datetime, timezone
-import json
+from backend.utils.clock import utcnow_iso as _utcnow_iso
 
 # ----------------------
 # Backend modules
 # ----------------------
 from backend.state.claim_state import ClaimState
-from backend.db.sqlite_store import init_db, fetch_claim_and_docs, update_claim_fields
+from backend.db.sqlite_store import (
+    init_db,
+    async_fetch_claim_and_docs,
+    async_fetch_claim_status,
+    async_update_claim_fields,
+)
+from backend.utils.state_builder import dump_validation
 from backend.agents.registration_agent import registration_agent
 from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.mcp_tools.claim_processing import ALLOWED_DECISIONS
+from backend.agents.manager_agent import ManagerAgent
+from backend.agents.investigator_agent import assignment_fields
 
 # ----------------------
 # FastAPI app init
@@ -29,6 +38,16 @@ def startup():
 # ----------------------
 mcp = FastMCP.from_fastapi(app=app)  # no 'title' argument
 
+# ----------------------
+# Shared helpers
+# ----------------------
+# ManagerAgent keeps no per-request state, so one instance serves every tool call
+MANAGER = ManagerAgent()
+
+# Final decisions that the graph/manager will never change on a re-run
+TERMINAL_DECISIONS = frozenset({"APPROVED", "REJECTED", "ESCALATED_TO_SIU"})
+
+
 # ----------------------
 # MCP Tool: Register Claim
 # ----------------------
@@ -52,14 +71,14 @@ async def ClaimRegistrationTool(
     )
 
     # Run registration agent
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
     # Persist claim
-    update_claim_fields(
+    await async_update_claim_fields(
         state.transaction_id,
         extracted_text=description,
         status="REGISTERED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
     return {
@@ -73,8 +92,8 @@ async def ClaimRegistrationTool(
 # MCP Tool: Check Status
 # ----------------------
 @mcp.tool
-def ClaimStatusTool(transaction_id: str):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+async def ClaimStatusTool(transaction_id: str):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Transaction not found"}
 
@@ -89,15 +108,33 @@ def ClaimStatusTool(transaction_id: str):
 # ----------------------
 # MCP Tool: AI Processing (Manager)
 # ----------------------
-from backend.agents.manager_agent import ManagerAgent
-
 @mcp.tool
 async def ManagerProcessingTool(transaction_id: str):
     # 1️⃣ Fetch claim from DB
-    claim, docs = fetch_claim_and_docs(transaction_id)
+    claim, docs = await async_fetch_claim_and_docs(transaction_id, include_text=True)
     if not claim:
         return {"error": "Claim not found"}
 
+    # Already decided → return the stored outcome without re-running the graph
+    if claim.get("final_decision") in TERMINAL_DECISIONS:
+        return {
+            "transaction_id": transaction_id,
+            "claim_id": claim["claim_id"],
+            "policy_number": claim["policy_number"],
+            "customer_name": claim["customer_name"],
+            "description": claim["extracted_text"],
+            "amount": claim["amount"],
+            "claim_type": claim["claim_type"],
+            "documents": docs,
+            "status": claim["status"],
+            "final_decision": claim.get("final_decision"),
+            "validation": claim.get("validation"),
+            "fraud_score": claim.get("fraud_score"),
+            "fraud_decision": claim.get("fraud_decision"),
+            "manager_decision": claim.get("manager_decision"),
+            "ai_raw_state": None
+        }
+
     # 2️⃣ Build ClaimState
     state = ClaimState(
         transaction_id=claim["transaction_id"],
@@ -112,25 +149,28 @@ async def ManagerProcessingTool(transaction_id: str):
         documents=docs
     )
 
-    # 3️⃣ Run AI workflow (claim_graph_v3)
-    final_state = await claim_graph_v3.ainvoke(state)
+    # 3️⃣ Run AI workflow (claim_graph_v3) and 4️⃣ Manager Agent concurrently;
+    # the manager only routes on the pre-graph state, so it gets its own copy
+    final_state, manager_result = await asyncio.gather(
+        claim_graph_v3.ainvoke(state),
+        asyncio.to_thread(MANAGER.run, state.model_copy(deep=True))
+    )
     if not isinstance(final_state, dict):
         final_state = final_state.model_dump()
 
-    # 4️⃣ Run Manager Agent
-    manager = ManagerAgent()
-    manager_result = manager.run(state)
-
-    # 5️⃣ Persist only JSON-serializable fields to DB
-    update_claim_fields(
+    # 5️⃣ Persist only JSON-serializable fields to DB (single write,
+    #    including any investigator assignment made by the graph)
+    now = _utcnow_iso()
+    await async_update_claim_fields(
         transaction_id,
+        **assignment_fields(final_state.get("assignment"), now),
         final_decision=manager_result.get("final_decision"),
         status=final_state.get("final_decision") or "UNDER_REVIEW",
         fraud_score=final_state.get("fraud_score"),
         fraud_decision=final_state.get("fraud_decision"),
-        validation=str(final_state.get("validation")),  # convert to string if complex
+        validation=dump_validation(final_state.get("validation")),  # JSON text column
         manager_decision=manager_result.get("manager_decision"),
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=now
     )
 
     # 6️⃣ Return clean JSON for UI
@@ -145,7 +185,7 @@ async def ManagerProcessingTool(transaction_id: str):
         "documents": docs,
         "status": manager_result.get("final_decision") or "UNDER_REVIEW",
         "final_decision": manager_result.get("final_decision"),
-        "validation": str(final_state.get("validation")),  # safe for JSON
+        "validation": dump_validation(final_state.get("validation")),  # safe for JSON
         "fraud_score": final_state.get("fraud_score"),
         "fraud_decision": final_state.get("fraud_decision"),
         "manager_decision": manager_result.get("manager_decision"),
@@ -156,22 +196,21 @@ async def ManagerProcessingTool(transaction_id: str):
 # MCP Tool: Manager Decision (Override)
 # ----------------------
 @mcp.tool
-def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+async def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Claim not found"}
 
     decision = decision.upper()
-    valid_decisions = ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]
-    if decision not in valid_decisions:
+    if decision not in ALLOWED_DECISIONS:
         return {"error": "Invalid decision"}
 
-    update_claim_fields(
+    await async_update_claim_fields(
         transaction_id,
         final_decision=decision,
         status=decision,
         manager_comment=comment,
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
     return {
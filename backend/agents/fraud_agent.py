@@ -1,14 +1,29 @@
-from backend.services.llm_client import llm_response
+from backend.services import llm_batcher
+from backend.utils.logger import logger
 from backend.utils.safe_json import safe_json_parse
 import os
 
+# Env is fixed after startup (llm_client has already run load_dotenv)
+_HAS_LLM = bool(os.getenv("GOOGLE_API_KEY"))
+_FALLBACK_JSON = '{"fraud_score": 0.0, "fraud_decision": "SAFE"}'
+_FALLBACK_RESULT = {"fraud_score": 0.0, "fraud_decision": "SAFE"}
+
+_PROMPT_TEMPLATE = """
+    You are an insurance fraud detection AI.
+
+    Claim Amount: {amount}
+    Claim Text: {text}
+
+    Return ONLY a minified JSON object with keys:
+    - "fraud_score": float between 0.0 and 1.0
+    - "fraud_decision": "SAFE" or "SUSPECT"
+    """
+
 def _sanitize_result(data: dict) -> dict:
     out = {}
     # fraud_score
     try:
-        out["fraud_score"] = float(data.get("fraud_score", 0.0))
-        if out["fraud_score"] < 0: out["fraud_score"] = 0.0
-        if out["fraud_score"] > 1: out["fraud_score"] = 1.0
+        out["fraud_score"] = min(1.0, max(0.0, float(data.get("fraud_score", 0.0))))
     except (TypeError, ValueError):
         out["fraud_score"] = 0.0
 
@@ -17,35 +32,14 @@ def _sanitize_result(data: dict) -> dict:
     out["fraud_decision"] = "SUSPECT" if decision == "SUSPECT" else "SAFE"
     return out
 
-def fraud_agent(state):
-    # Prepare prompt
-    prompt = f"""
-    You are an insurance fraud detection AI.
-
-    Claim Amount: {state.amount}
-    Claim Text: {state.extracted_text}
-
-    Return ONLY a minified JSON object with keys:
-    - "fraud_score": float between 0.0 and 1.0
-    - "fraud_decision": "SAFE" or "SUSPECT"
-    """
-
-    # Fallback if API key is missing
-    if not os.getenv("GOOGLE_API_KEY"):
-        print("[fraud_agent] WARNING: GOOGLE_API_KEY not set. Using fallback fraud score.")
-        raw_result = '{"fraud_score": 0.0, "fraud_decision": "SAFE"}'
-    else:
-        try:
-            raw_result = llm_response(prompt)
-        except Exception as e:
-            print(f"[fraud_agent] ERROR calling LLM: {e}")
-            raw_result = '{"fraud_score": 0.0, "fraud_decision": "SAFE"}'
+def build_fraud_prompt(state) -> str:
+    return _PROMPT_TEMPLATE.format(amount=state.amount, text=state.extracted_text)
 
-    print("Raw LLM response (fraud_agent):", repr(raw_result))
+def apply_fraud_response(state, raw_result):
+    logger.debug("Raw LLM response (fraud_agent): %r", raw_result)
 
     # Parse and sanitize
-    fallback = {"fraud_score": 0.0, "fraud_decision": "SAFE"}
-    parsed = safe_json_parse(raw_result, fallback)
+    parsed = safe_json_parse(raw_result, _FALLBACK_RESULT)
     cleaned = _sanitize_result(parsed)
 
     # Update claim state
@@ -54,3 +48,20 @@ def fraud_agent(state):
     state.fraud_decision = cleaned["fraud_decision"]
 
     return state
+
+def fraud_agent(state):
+    # Prepare prompt
+    prompt = build_fraud_prompt(state)
+
+    # Fallback if API key is missing
+    if not _HAS_LLM:
+        logger.warning("[fraud_agent] GOOGLE_API_KEY not set. Using fallback fraud score.")
+        raw_result = _FALLBACK_JSON
+    else:
+        try:
+            raw_result = llm_batcher.submit(prompt)
+        except Exception as e:
+            logger.error("[fraud_agent] ERROR calling LLM: %s", e)
+            raw_result = _FALLBACK_JSON
+
+    return apply_fraud_response(state, raw_result)
@@ -13,21 +13,28 @@ It updates:
 - state.assignment.reason
 - state.logs (for audit trail)
 
+It does NOT write to the claims DB; callers merge `assignment_fields(...)`
+into their own `update_claim_fields` call so each tool run commits once.
+Callers with no claim update of their own use `assign_and_persist` instead.
+
 This agent is typically invoked after the fraud agent in v3 flow:
     register → validate → fraud → (investigator?) → manager
 """
 
-from datetime import datetime, timezone
-
-from backend.db.investigator_store import (
-    get_available_investigator,
-    increment_investigator_load
-)
+from typing import Any, Dict
 
+from backend.db.investigator_store import claim_available_investigator, get_available_investigator
 from backend.db.sqlite_store import update_claim_fields
+from backend.utils.clock import utcnow_iso
+
+ASSIGNMENT_REASON = "High fraud risk"
 
 
-def investigator_agent(state):
+def investigator_agent(state, dry_run: bool = False):
+    """
+    dry_run=True only previews who would be assigned: the investigator's
+    load is not incremented (for read-only views such as summaries).
+    """
 
     # -----------------------------------
     # 1️⃣ Only assign if fraud checked
@@ -44,34 +51,60 @@ def investigator_agent(state):
         return state
 
     # -----------------------------------
-    # 3️⃣ Fetch available investigator
+    # 3️⃣ Pick investigator + increment workload (one atomic UPDATE)
     # -----------------------------------
-    investigator_id = get_available_investigator(state.claim_type)
+    if dry_run:
+        investigator_id = get_available_investigator(state.claim_type)
+    else:
+        investigator_id = claim_available_investigator(state.claim_type)
 
     if not investigator_id:
         state.logs.append("[investigator] No available investigator")
         return state
 
     # -----------------------------------
-    # 4️⃣ Increment workload
+    # 4️⃣ Record assignment on state
+    #    (persisted by the caller via assignment_fields)
     # -----------------------------------
-    increment_investigator_load(investigator_id)
+    state.assignment.investigator_id = investigator_id
+    state.assignment.reason = ASSIGNMENT_REASON
+    state.logs.append(f"[investigator] {'Suggested' if dry_run else 'Assigned'} {investigator_id}")
 
-    # -----------------------------------
-    # 5️⃣ Update claims DB (VERY IMPORTANT)
-    # -----------------------------------
-    update_claim_fields(
-        state.transaction_id,
-        investigator_id=investigator_id,
-        assignment_reason="High fraud risk",
-        assignment_status="ASSIGNED",
-        assigned_at=datetime.now(timezone.utc).isoformat()
-    )
+    return state
 
-    # -----------------------------------
-    # 6️⃣ Update state (optional but recommended)
-    # -----------------------------------
-    state.logs.append(f"[investigator] Assigned {investigator_id}")
-    state.assignment_done = True
 
+def assign_and_persist(state):
+    """
+    investigator_agent + its claims-row write, for callers that don't merge
+    assignment_fields into an update of their own (otherwise the
+    investigator's load is incremented with no claim recording it).
+    """
+    state = investigator_agent(state)
+    fields = assignment_fields(state.assignment, utcnow_iso())
+    if fields:
+        update_claim_fields(state.transaction_id, **fields)
     return state
+
+
+def assignment_fields(assignment, assigned_at: str) -> Dict[str, Any]:
+    """
+    Claim columns to persist for an investigator assignment.
+    Accepts the Assignment model or its dumped dict; returns {} when
+    no investigator was assigned.
+    """
+    if isinstance(assignment, dict):
+        investigator_id = assignment.get("investigator_id")
+        reason = assignment.get("reason")
+    else:
+        investigator_id = getattr(assignment, "investigator_id", None)
+        reason = getattr(assignment, "reason", None)
+
+    if not investigator_id:
+        return {}
+
+    return {
+        "investigator_id": investigator_id,
+        "assignment_reason": reason or ASSIGNMENT_REASON,
+        "assignment_status": "ASSIGNED",
+        "assigned_at": assigned_at
+    }
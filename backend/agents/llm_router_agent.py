@@ -1,25 +1,16 @@
 # backend/agents/llm_router_agent.py
-from backend.services.llm_client import llm_response
+from backend.services import llm_batcher
 from backend.state.claim_state import RouterDecision
 from backend.utils.safe_json import safe_json_parse
+from backend.utils.logger import logger
 
-def _to_bool(v):
-    if isinstance(v, bool): return v
-    if isinstance(v, str):
-        s = v.strip().lower()
-        if s in {"true","yes","y","1"}: return True
-        if s in {"false","no","n","0"}: return False
-    if isinstance(v, (int, float)): return bool(v)
-    return False
-
-def llm_router_agent(state):
-    prompt = f"""
+_PROMPT_TEMPLATE = """
     You are an insurance claim routing AI.
 
     Claim Details:
-    Claim ID: {state.claim_id}
-    Amount: {state.amount}
-    Extracted Text: {state.extracted_text}
+    Claim ID: {claim_id}
+    Amount: {amount}
+    Extracted Text: {text}
 
     Return ONLY a minified JSON object with keys:
     - "fraud_check": boolean
@@ -29,8 +20,22 @@ def llm_router_agent(state):
     Example: {{"fraud_check": false, "manual_review": false, "need_documents": false}}
     """
 
-    result = llm_response(prompt)
-    print("Raw LLM response (router):", repr(result))
+def _to_bool(v):
+    if isinstance(v, bool): return v
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in {"true","yes","y","1"}: return True
+        if s in {"false","no","n","0"}: return False
+    if isinstance(v, (int, float)): return bool(v)
+    return False
+
+def llm_router_agent(state):
+    prompt = _PROMPT_TEMPLATE.format(
+        claim_id=state.claim_id, amount=state.amount, text=state.extracted_text
+    )
+
+    result = llm_batcher.submit(prompt)
+    logger.debug("Raw LLM response (router): %r", result)
 
     fallback = {"fraud_check": False, "manual_review": True, "need_documents": True}
     parsed = safe_json_parse(result, fallback)
@@ -42,7 +47,7 @@ def llm_router_agent(state):
     }
 
     # Optional: log the sanitized decision
-    print("[router] decision:", decision)
+    logger.debug("[router] decision: %s", decision)
 
     state.router_decision = RouterDecision(**decision)
     return state
\ No newline at end of file
@@ -1,19 +1,51 @@
-import json
+import re
 from backend.state.claim_state import ClaimState, ValidationResult
-from backend.services.llm_client import llm_response
+from backend.services import llm_batcher
+from backend.utils.safe_json import json_loads
+
+# Quota / rate-limit markers in a raw LLM response, matched in a single pass
+_RATE_LIMIT_RE = re.compile(r"resource_exhausted|quota|rate limit|429", re.IGNORECASE)
+
+# Static part of the prompt, formatted once per claim with claim_type/claim_amount
+_PROMPT_HEADER = """
+You are an expert insurance claim validator.
+
+Return STRICT minified JSON only (no markdown).
+
+{{
+  "documents_detected": {{"itemized_invoice": false,"payment_receipt": false,"fir": false,"id_proof": false,"discharge_summary": false}},
+  "missing_documents": [],
+  "fields_extracted": {{"invoice_number": null,"invoice_total": null,"invoice_date": null}},
+  "amount_matches_claim": false,
+  "validation_passed": false,
+  "warnings": [],
+  "errors": []
+}}
+
+### CLAIM DETAILS ###
+claim_type = "{claim_type}"
+claim_amount = "{claim_amount}"
+
+### OCR DOCUMENTS ###
+"""
+
 
 # ============================================================
 # FALLBACK RULE-BASED VALIDATION
 # ============================================================
 
+_REQUIRED_DOCS = {
+    "motor": frozenset(("fir", "itemized_invoice", "payment_receipt", "id_proof")),
+    "health": frozenset(("discharge_summary", "itemized_invoice", "payment_receipt", "id_proof")),
+}
+_DEFAULT_REQUIRED = frozenset(("itemized_invoice", "payment_receipt", "id_proof"))
+
+
 def _fallback_validation(state: ClaimState) -> ClaimState:
-    required = {
-        "motor": ["fir", "itemized_invoice", "payment_receipt", "id_proof"],
-        "health": ["discharge_summary", "itemized_invoice", "payment_receipt", "id_proof"]
-    }.get((state.claim_type or "").lower(), ["itemized_invoice", "payment_receipt", "id_proof"])
+    required = _REQUIRED_DOCS.get((state.claim_type or "").lower(), _DEFAULT_REQUIRED)
 
     present = {d.doc_type for d in state.documents if d.doc_type}
-    missing = [r for r in required if r not in present]
+    missing = sorted(required - present)
 
     vr = ValidationResult(
         required_missing=missing,
@@ -32,38 +64,31 @@ def _fallback_validation(state: ClaimState) -> ClaimState:
 # LLM VALIDATION AGENT WITH ENHANCED LOGGING
 # ============================================================
 
-def llm_validation_agent(state: ClaimState) -> ClaimState:
-
-    state.logs.append("[validation_llm] start")
+def build_validation_prompt(state: ClaimState) -> str:
+    parts = [_PROMPT_HEADER.format(claim_type=state.claim_type, claim_amount=state.amount)]
+    parts.extend(
+        f"\n\n### DOC_{i+1} ({doc.filename}, {doc.doc_type}) ###\n{doc.extracted_text or ''}\n"
+        for i, doc in enumerate(state.documents)
+    )
+    return "".join(parts)
 
-    prompt = f"""
-You are an expert insurance claim validator.
 
-Return STRICT minified JSON only (no markdown).
+def llm_validation_agent(state: ClaimState) -> ClaimState:
 
-{{
-  "documents_detected": {{"itemized_invoice": false,"payment_receipt": false,"fir": false,"id_proof": false,"discharge_summary": false}},
-  "missing_documents": [],
-  "fields_extracted": {{"invoice_number": null,"invoice_total": null,"invoice_date": null}},
-  "amount_matches_claim": false,
-  "validation_passed": false,
-  "warnings": [],
-  "errors": []
-}}
+    state.logs.append("[validation_llm] start")
 
-### CLAIM DETAILS ###
-claim_type = "{state.claim_type}"
-claim_amount = "{state.amount}"
+    try:
+        raw = llm_batcher.submit(build_validation_prompt(state))
+    except Exception as e:
+        state.logs.append(f"[validation_llm] exception={type(e).__name__}: {e} -> fallback")
+        return _fallback_validation(state)
 
-### OCR DOCUMENTS ###
-"""
+    return apply_validation_response(state, raw)
 
-    for i, doc in enumerate(state.documents):
-        prompt += f"\n\n### DOC_{i+1} ({doc.filename}, {doc.doc_type}) ###\n{doc.extracted_text or ''}\n"
 
+def apply_validation_response(state: ClaimState, raw) -> ClaimState:
+    """Parse a raw LLM validation response onto `state` (fallback on any problem)."""
     try:
-        raw = llm_response(prompt)
-
         # --------------------------------------------------
         # 1️⃣ Empty response
         # --------------------------------------------------
@@ -85,12 +110,10 @@ claim_amount = "{state.amount}"
             state.logs.append(f"[validation_llm] invalid response type -> fallback: {type(raw)}")
             return _fallback_validation(state)
 
-        lower_raw = raw.lower()
-
         # --------------------------------------------------
         # 4️⃣ Rate limit / quota
         # --------------------------------------------------
-        if any(x in lower_raw for x in ["resource_exhausted", "quota", "rate limit", "429"]):
+        if _RATE_LIMIT_RE.search(raw):
             state.logs.append(f"[validation_llm] rate limit detected -> fallback: {raw}")
             return _fallback_validation(state)
 
@@ -98,7 +121,7 @@ claim_amount = "{state.amount}"
         # 5️⃣ Parse JSON safely
         # --------------------------------------------------
         try:
-            parsed = json.loads(raw)
+            parsed = json_loads(raw)
         except Exception as e:
             state.logs.append(f"[validation_llm] JSON parse failed -> fallback: {e} | raw={raw}")
             return _fallback_validation(state)
@@ -131,6 +154,5 @@ claim_amount = "{state.amount}"
     except Exception as e:
         # Capture exception type, message, and optionally raw LLM output
         state.logs.append(f"[validation_llm] exception={type(e).__name__}: {e} -> fallback")
-        if 'raw' in locals():
-            state.logs.append(f"[validation_llm] last LLM output (partial)={raw}")
+        state.logs.append(f"[validation_llm] last LLM output (partial)={raw}")
         return _fallback_validation(state)
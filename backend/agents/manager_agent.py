@@ -1,8 +1,10 @@
 from typing import Dict, Any
-from datetime import datetime, timezone
 
 from backend.state.claim_state import ClaimState
 from backend.db.sqlite_store import update_claim_fields
+from backend.utils.logger import logger
+from backend.utils.clock import utcnow_iso
+from backend.agents.routing import MANAGER_DECISIONS, route
 
 
 class ManagerAgent:
@@ -22,31 +24,12 @@ class ManagerAgent:
     # Routing Logic
     # -----------------------------------
     def decide_next_step(self, state: ClaimState) -> str:
-
-        if not state.claim_registered:
-            return "registration_agent"
-
-        if not state.claim_validated:
-            return "validation_agent"
-
-        if not state.fraud_checked:
-            return "fraud_agent"
-
-        if not state.claim_decision_made:
-            return "decision_agent"
-
-        if state.claim_approved and not state.payment_processed:
-            return "payment_agent"
-
-        if state.payment_processed and not state.claim_closed:
-            return "closure_agent"
-
-        return "end"
+        return route(state)
 
     # -----------------------------------
     # Final Decision Logic
     # -----------------------------------
-    def finalize_claim(self, state: ClaimState):
+    def finalize_claim(self, state: ClaimState, persist: bool = True):
 
         if not state.validation or not getattr(state.validation, "docs_ok", False):
             state.final_decision = "PENDING_DOCUMENTS"
@@ -64,32 +47,35 @@ class ManagerAgent:
             state.final_decision = "REJECTED"
             status = "REJECTED"
 
+        if not persist:
+            return state
+
         # Persist in DB
         try:
             update_claim_fields(
                 state.transaction_id,
                 final_decision=state.final_decision,
                 status=status,
-                updated_at=datetime.now(timezone.utc).isoformat()
+                updated_at=utcnow_iso()
             )
         except Exception as e:
-            print(f"[Manager] DB update failed: {e}")
+            logger.error("[Manager] DB update failed: %s", e)
 
         return state
 
     # -----------------------------------
     # Graph Entry
     # -----------------------------------
-    def run(self, state: ClaimState) -> Dict[str, Any]:
+    def run(self, state: ClaimState, persist: bool = True) -> Dict[str, Any]:
 
         next_step = self.decide_next_step(state)
 
-        # 🔥 If workflow finished → finalize
+        # 🔥 If workflow finished → finalize (persist=False: decide only, no DB write)
         if next_step == "end":
-            state = self.finalize_claim(state)
+            state = self.finalize_claim(state, persist)
 
         return {
             "next_step": next_step,
             "final_decision": getattr(state, "final_decision", None),
-            "manager_decision": f"Routing to {next_step}"
+            "manager_decision": MANAGER_DECISIONS[next_step]
         }
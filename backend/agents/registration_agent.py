@@ -1,28 +1,52 @@
 from backend.utils.logger import logger
 from backend.state.claim_state import ClaimState
-from datetime import datetime, timezone
 import uuid
-from backend.db.sqlite_store import init_db, upsert_claim_registration, insert_documents
-init_db()
+from backend.db.sqlite_store import init_db, register_claim_with_docs
+from backend.utils.clock import utcnow_iso
+
+# init_db() runs once per process, on first registration, instead of at import
+_INIT_DONE = False
+
+def _ensure_init():
+    global _INIT_DONE
+    if _INIT_DONE:
+        return
+    init_db()
+    _INIT_DONE = True
 
 MAX_TEXT_LEN = 50000
 
 def _aggregate_extracted_text(state: ClaimState) -> str:
-    parts = []
-    if state.extracted_text:
-        parts.append(state.extracted_text)
-    for d in state.documents:
-        if d.extracted_text:
-            parts.append(d.extracted_text)
-    combined = "\n\n".join([p.strip() for p in parts if p and p.strip()])
-    return combined[:MAX_TEXT_LEN] if combined else ""
+    # Append parts until MAX_TEXT_LEN is reached instead of joining every
+    # OCR payload in full and truncating afterwards
+    sep = "\n\n"
+    out = []
+    room = MAX_TEXT_LEN
+    for src in (state.extracted_text, *(d.extracted_text for d in state.documents)):
+        if room <= 0:
+            break
+        if not src:
+            continue
+        p = src.strip()
+        if not p:
+            continue
+        if out:
+            out.append(sep[:room])
+            room -= len(out[-1])
+            if room <= 0:
+                break
+        out.append(p[:room])
+        room -= len(out[-1])
+    return "".join(out)
 
 def registration_agent(state: ClaimState):
+    _ensure_init()
     if not state.transaction_id:
         state.transaction_id = str(uuid.uuid4())
     state.claim_registered = True
     if not state.registered_at:
-        state.registered_at = datetime.now(timezone.utc).isoformat()
+        # Same format as every other timestamp column (microseconds, +00:00)
+        state.registered_at = utcnow_iso()
 
     # Aggregate OCR into extracted_text
     agg = _aggregate_extracted_text(state)
@@ -31,26 +55,28 @@ def registration_agent(state: ClaimState):
 
     # Persist
     try:
-        upsert_claim_registration(
-            transaction_id=state.transaction_id,
-            claim_id=state.claim_id,
-            customer_name=state.customer_name,
-            policy_number=state.policy_number,
-            amount=state.amount,
-            claim_type=state.claim_type,
-            extracted_text=state.extracted_text,
-            registered_at=state.registered_at,
-            status="REGISTERED",
+        register_claim_with_docs(
+            dict(
+                transaction_id=state.transaction_id,
+                claim_id=state.claim_id,
+                customer_name=state.customer_name,
+                policy_number=state.policy_number,
+                amount=state.amount,
+                claim_type=state.claim_type,
+                extracted_text=state.extracted_text,
+                registered_at=state.registered_at,
+                status="REGISTERED",
+            ),
+            [
+                {
+                  "filename": d.filename, "content_type": d.content_type, "size_bytes": d.size_bytes,
+                  "doc_type": d.doc_type, "extracted_text": (d.extracted_text or "")[:MAX_TEXT_LEN]
+                } for d in state.documents
+            ]
         )
-        insert_documents(state.transaction_id, [
-            {
-              "filename": d.filename, "content_type": d.content_type, "size_bytes": d.size_bytes,
-              "doc_type": d.doc_type, "extracted_text": (d.extracted_text or "")[:MAX_TEXT_LEN]
-            } for d in state.documents
-        ])
-        logger.info(f"[RegistrationAgent] Claim registered & saved: {state.claim_id} tx={state.transaction_id}")
+        logger.info("[RegistrationAgent] Claim registered & saved: %s tx=%s", state.claim_id, state.transaction_id)
         state.logs.append(f"[registration] saved tx={state.transaction_id}")
     except Exception as e:
-        logger.error(f"[RegistrationAgent] DB error: {type(e).__name__}: {e}")
+        logger.error("[RegistrationAgent] DB error: %s: %s", type(e).__name__, e)
         state.logs.append(f"[registration] db_error={type(e).__name__}")
     return state
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Claim workflow routing shared by the ManagerAgent variants:
+state flags → next agent to run.
+"""
+
+# -----------------------------------
+# Routing Table
+# -----------------------------------
+# Bit i of the routing mask is set when state.<_ROUTING_FLAGS[i]> is truthy.
+_ROUTING_FLAGS = (
+    "claim_registered",
+    "claim_validated",
+    "fraud_checked",
+    "claim_decision_made",
+    "claim_approved",
+    "payment_processed",
+    "claim_closed",
+)
+
+
+def _route(registered, validated, fraud_checked, decision_made, approved, paid, closed) -> str:
+
+    # Step 1 — Registration
+    if not registered:
+        return "registration_agent"
+
+    # Step 2 — Validation
+    if not validated:
+        return "validation_agent"
+
+    # Step 3 — Fraud Check
+    if not fraud_checked:
+        return "fraud_agent"
+
+    # Step 4 — Decision
+    if not decision_made:
+        return "decision_agent"
+
+    # Step 5 — Payment
+    if approved and not paid:
+        return "payment_agent"
+
+    # Step 6 — Close Claim
+    if paid and not closed:
+        return "closure_agent"
+
+    return "end"
+
+
+# Next step for every combination of the routing flags, built once at import
+_NEXT_STEP = tuple(
+    _route(*((mask >> bit) & 1 for bit in range(len(_ROUTING_FLAGS))))
+    for mask in range(1 << len(_ROUTING_FLAGS))
+)
+
+MANAGER_DECISIONS = {step: f"Routing to {step}" for step in set(_NEXT_STEP)}
+
+
+def route(state) -> str:
+    """Name of the agent that should run next for `state`."""
+    mask = 0
+    for bit, flag in enumerate(_ROUTING_FLAGS):
+        if getattr(state, flag):
+            mask |= 1 << bit
+    return _NEXT_STEP[mask]
@@ -3,7 +3,7 @@ from backend.state.claim_state import ClaimState
 
 
 def validation_agent(state: ClaimState):
-    logger.info(f"[ValidationAgent] Validating claim {state.claim_id}")
+    logger.info("[ValidationAgent] Validating claim %s", state.claim_id)
 
     if state.amount is None:
         logger.error("[ValidationAgent] Claim amount missing")
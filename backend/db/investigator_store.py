@@ -1,5 +1,8 @@
+import atexit
 import os, sqlite3
-from contextlib import contextmanager
+
+from backend.db.pool import SQLitePool
+from backend.db.writer import BackgroundWriter
 
 # -----------------------------
 # Stable absolute DB path
@@ -18,24 +21,31 @@ os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 # ============================================================
 # CONNECTION
 # ============================================================
+# Connections are pooled and reused across calls (see backend/db/pool.py)
+POOL_SIZE = int(os.getenv("INVESTIGATOR_DB_POOL_SIZE", "4"))
 
 def _connect():
     conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # Per-connection tuning (WAL itself is persisted by init_investigator_db)
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA cache_size = -64000;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
     return conn
 
 
-@contextmanager
+_pool = SQLitePool(_connect, size=POOL_SIZE)
+atexit.register(_pool.close)
+
+
 def db_conn():
-    conn = _connect()
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    return _pool.connection()
+
+
+# Load counter updates are group-committed by a background writer thread
+_writer = BackgroundWriter(db_conn, name="investigator-writer")
 
 
 # ============================================================
@@ -70,10 +80,22 @@ def _ensure_extra_columns(conn):
 # INIT DB
 # ============================================================
 
+# Bump whenever init_investigator_db() changes the schema or seed data;
+# stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+
 def init_investigator_db():
     print(f"[INVESTIGATOR DB] Using: {DB_PATH}")
 
     with db_conn() as conn:
+        # Schema already current → skip table_info scans, ALTERs and seeding
+        if conn.execute("PRAGMA user_version;").fetchone()[0] == SCHEMA_VERSION:
+            return
+
+        # WAL is a persistent DB setting: readers no longer block the writer
+        conn.execute("PRAGMA journal_mode = WAL;")
+
         conn.execute("""
         CREATE TABLE IF NOT EXISTS investigators (
             investigator_id TEXT PRIMARY KEY,
@@ -87,8 +109,16 @@ def init_investigator_db():
 
         _ensure_extra_columns(conn)
 
+        # get_available_investigator: seek on specialization/status, ordered by load
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_inv_dispatch
+        ON investigators(specialization, status, active_cases);
+        """)
+
         seed_investigators(conn)
 
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+
 
 # ============================================================
 # SEED DATA
@@ -108,12 +138,11 @@ def seed_investigators(conn):
         ("INV010", "Vikram Patel", "health", 1, 4, "INACTIVE"),
     ]
 
-    for inv in investigators:
-        conn.execute("""
-        INSERT OR IGNORE INTO investigators
-        (investigator_id, name, specialization, active_cases, max_cases, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """, inv)
+    conn.executemany("""
+    INSERT OR IGNORE INTO investigators
+    (investigator_id, name, specialization, active_cases, max_cases, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, investigators)
 
 
 # ============================================================
@@ -135,23 +164,46 @@ def get_available_investigator(claim_type: str):
         return row["investigator_id"] if row else None
 
 
-def increment_investigator_load(investigator_id: str):
+def claim_available_investigator(claim_type: str):
+    """
+    Pick the least-loaded available investigator and increment their load in
+    one atomic statement. Returns the investigator_id, or None.
+    """
     with db_conn() as conn:
-        conn.execute("""
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("""
             UPDATE investigators
             SET active_cases = active_cases + 1
-            WHERE investigator_id = ?
-        """, (investigator_id,))
+            WHERE investigator_id = (
+                SELECT investigator_id
+                FROM investigators
+                WHERE specialization = ?
+                AND status = 'ACTIVE'
+                AND active_cases < max_cases
+                ORDER BY active_cases ASC
+                LIMIT 1
+            )
+            RETURNING investigator_id
+        """, (claim_type,)).fetchone()
+
+        return row["investigator_id"] if row else None
+
+
+def increment_investigator_load(investigator_id: str):
+    _writer.run(lambda conn: conn.execute("""
+        UPDATE investigators
+        SET active_cases = active_cases + 1
+        WHERE investigator_id = ?
+    """, (investigator_id,)))
 
 
 def decrement_investigator_load(investigator_id: str):
-    with db_conn() as conn:
-        conn.execute("""
-            UPDATE investigators
-            SET active_cases =
-                CASE
-                    WHEN active_cases > 0 THEN active_cases - 1
-                    ELSE 0
-                END
-            WHERE investigator_id = ?
-        """, (investigator_id,))
+    _writer.run(lambda conn: conn.execute("""
+        UPDATE investigators
+        SET active_cases =
+            CASE
+                WHEN active_cases > 0 THEN active_cases - 1
+                ELSE 0
+            END
+        WHERE investigator_id = ?
+    """, (investigator_id,)))
@@ -0,0 +1,70 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+
+# ============================================================
+# SQLITE CONNECTION POOL
+# ============================================================
+# Connections are opened lazily (up to `size`) and returned to a LIFO queue
+# after each use, so the most recently used — and warmest — connection is
+# handed out next. Callers block once all `size` connections are checked out.
+
+class SQLitePool:
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], size: int = 8):
+        self._connect = connect
+        self._size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._opened < self._size
+            if can_open:
+                self._opened += 1
+
+        if not can_open:
+            return self._idle.get()
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, roll back on error."""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close idle connections (the last close checkpoints the WAL)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._opened -= 1
+            conn.close()
@@ -1,7 +1,15 @@
+import asyncio
+import atexit
 import os
 import sqlite3
 import shutil
-from contextlib import contextmanager
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from backend.db.pool import SQLitePool
+from backend.db.writer import BackgroundWriter
 
 # -----------------------------
 # Stable absolute DB path
@@ -38,24 +46,145 @@ else:
 # ============================================================
 # CONNECTION
 # ============================================================
+# Connections are pooled and reused across calls (see backend/db/pool.py).
+# Reads share a pool of POOL_SIZE query-only connections; all writes go
+# through one dedicated writer connection (the background writer thread and
+# init_db), so readers never queue behind a write on WAL.
+POOL_SIZE = int(os.getenv("CLAIMS_DB_POOL_SIZE", "8"))
+# Room for every fixed query plus the per-column-set UPDATE and per-size
+# INSERT variants, so sqlite3 never re-prepares a hot statement
+STATEMENT_CACHE_SIZE = 256
+
 def _connect():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    # Per-connection tuning (WAL itself is persisted by init_db)
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA cache_size = -64000;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
     return conn
 
 
-@contextmanager
-def db_conn():
+def _connect_reader():
     conn = _connect()
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+
+_pool = SQLitePool(_connect_reader, size=POOL_SIZE)
+_writer_pool = SQLitePool(_connect, size=1)
+atexit.register(_pool.close)
+atexit.register(_writer_pool.close)
+
+
+def db_conn():
+    """Read-only pooled connection."""
+    return _pool.connection()
+
+
+def writer_conn():
+    """The single writer connection; only the background writer and init_db use it."""
+    return _writer_pool.connection()
+
+
+def rows_as_dicts(cur) -> list[dict]:
+    """Materialize a cursor as dicts, reading column names once from cursor.description."""
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, r)) for r in cur]
+
+
+# Claim writes are group-committed by a background writer thread; the public
+# write functions below still block until their batch has committed.
+_writer = BackgroundWriter(writer_conn, name="claims-writer")
+
+
+# ============================================================
+# CLAIM READ CACHE
+# ============================================================
+# Small in-process TTL LRU in front of fetch_claim_and_docs. Writers that go
+# through this module invalidate their transaction_id; the TTL bounds
+# staleness for writes made by other processes.
+CLAIM_CACHE_MAXSIZE = 512
+CLAIM_CACHE_TTL_S = 5.0
+
+_claim_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_claim_cache_lock = threading.Lock()
+
+# Invalidation generations, striped by hash(transaction_id). A reader takes
+# the generation before querying and only caches its rows if no invalidation
+# happened meanwhile; otherwise a write committing mid-read would be followed
+# by the reader caching the pre-write rows for the full TTL.
+_GEN_STRIPES = 256
+_generations = [0] * _GEN_STRIPES
+
+
+def _cache_generation(transaction_id: str) -> int:
+    return _generations[hash(transaction_id) % _GEN_STRIPES]
+
+
+def _cache_get(transaction_id: str):
+    with _claim_cache_lock:
+        entry = _claim_cache.get(transaction_id)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _claim_cache[transaction_id]
+            return None
+        _claim_cache.move_to_end(transaction_id)
+        return value
+
+
+def _cache_put(transaction_id: str, value, generation: int):
+    with _claim_cache_lock:
+        if _generations[hash(transaction_id) % _GEN_STRIPES] != generation:
+            return
+        _claim_cache[transaction_id] = (time.monotonic() + CLAIM_CACHE_TTL_S, value)
+        _claim_cache.move_to_end(transaction_id)
+        while len(_claim_cache) > CLAIM_CACHE_MAXSIZE:
+            _claim_cache.popitem(last=False)
+
+
+def invalidate_claim_cache(transaction_id: str):
+    with _claim_cache_lock:
+        _generations[hash(transaction_id) % _GEN_STRIPES] += 1
+        _claim_cache.pop(transaction_id, None)
+        _status_cache.pop(transaction_id, None)
+
+
+# Status polls only need a handful of columns, so they get their own, larger
+# cache (same TTL and lock). Registration writes the entry through; any other
+# write to the claim invalidates it like the claim cache above.
+STATUS_CACHE_MAXSIZE = 10_000
+
+_status_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _status_get(transaction_id: str):
+    with _claim_cache_lock:
+        entry = _status_cache.get(transaction_id)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _status_cache[transaction_id]
+            return None
+        _status_cache.move_to_end(transaction_id)
+        return value
+
+
+def _status_put(transaction_id: str, value: dict, generation: int | None = None):
+    # generation=None: write-through from the writer side (always current)
+    with _claim_cache_lock:
+        if generation is not None and _generations[hash(transaction_id) % _GEN_STRIPES] != generation:
+            return
+        _status_cache[transaction_id] = (time.monotonic() + CLAIM_CACHE_TTL_S, value)
+        _status_cache.move_to_end(transaction_id)
+        while len(_status_cache) > STATUS_CACHE_MAXSIZE:
+            _status_cache.popitem(last=False)
 
 
 # ============================================================
@@ -111,10 +240,21 @@ def _ensure_claims_extra_columns(conn):
 # ============================================================
 # INIT DATABASE
 # ============================================================
+# Bump whenever init_db() changes the schema; stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
+
 def init_db():
     print(f"[DB] Initializing database: {DB_PATH}")
 
-    with db_conn() as conn:
+    with writer_conn() as conn:
+        # Schema already current → skip table_info scans and ALTER checks
+        if conn.execute("PRAGMA user_version;").fetchone()[0] == SCHEMA_VERSION:
+            return
+
+        # WAL is a persistent DB setting: readers no longer block the writer
+        conn.execute("PRAGMA journal_mode = WAL;")
+
         conn.executescript("""
         CREATE TABLE IF NOT EXISTS claims (
             transaction_id TEXT PRIMARY KEY,
@@ -145,46 +285,74 @@ def init_db():
         # Auto-migrate missing columns safely
         _ensure_claims_extra_columns(conn)
 
+        # fetch_claim_and_docs filters documents by transaction_id. The index
+        # is ordered by (transaction_id, id), so "ORDER BY id" needs no sort,
+        # and covers every column of _DOCS_SQL, so status-style reads never
+        # touch the table rows holding OCR text. It supersedes idx_claims_tx.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_docs_tx_cover ON claim_documents(
+                transaction_id, id, filename, content_type, size_bytes, doc_type
+            );
+        """)
+        conn.execute("DROP INDEX IF EXISTS idx_claims_tx;")
+
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+
 
 # ============================================================
 # CLAIM OPERATIONS
 # ============================================================
-def upsert_claim_registration(**kwargs):
-    with db_conn() as conn:
-        conn.execute("""
-        INSERT INTO claims (
-          transaction_id, claim_id, customer_name, policy_number,
-          amount, claim_type, extracted_text, registered_at, status
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(transaction_id) DO UPDATE SET
-          claim_id=excluded.claim_id,
-          customer_name=excluded.customer_name,
-          policy_number=excluded.policy_number,
-          amount=excluded.amount,
-          claim_type=excluded.claim_type,
-          extracted_text=excluded.extracted_text,
-          registered_at=excluded.registered_at,
-          status=excluded.status
-        """, (
-          kwargs["transaction_id"],
-          kwargs["claim_id"],
-          kwargs.get("customer_name"),
-          kwargs.get("policy_number"),
-          kwargs.get("amount"),
-          kwargs.get("claim_type"),
-          kwargs.get("extracted_text"),
-          kwargs["registered_at"],
-          kwargs.get("status", "REGISTERED")
-        ))
-
+def _upsert_claim(conn, kwargs: dict):
+    return conn.execute("""
+    INSERT INTO claims (
+      transaction_id, claim_id, customer_name, policy_number,
+      amount, claim_type, extracted_text, registered_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(transaction_id) DO UPDATE SET
+      claim_id=excluded.claim_id,
+      customer_name=excluded.customer_name,
+      policy_number=excluded.policy_number,
+      amount=excluded.amount,
+      claim_type=excluded.claim_type,
+      extracted_text=excluded.extracted_text,
+      registered_at=excluded.registered_at,
+      status=excluded.status
+    RETURNING transaction_id, claim_id, policy_number, status, registered_at, final_decision
+    """, (
+      kwargs["transaction_id"],
+      kwargs["claim_id"],
+      kwargs.get("customer_name"),
+      kwargs.get("policy_number"),
+      kwargs.get("amount"),
+      kwargs.get("claim_type"),
+      kwargs.get("extracted_text"),
+      kwargs["registered_at"],
+      kwargs.get("status", "REGISTERED")
+    )).fetchone()
+
+
+DOC_INSERT_CHUNK = 50
+_DOC_INSERT_SQL: dict[int, str] = {}
+
+
+def _doc_insert_sql(n: int) -> str:
+    """Multi-row INSERT for `n` documents, built once per chunk length."""
+    sql = _DOC_INSERT_SQL.get(n)
+    if sql is None:
+        sql = (
+            "INSERT INTO claim_documents ("
+            "transaction_id, filename, content_type, "
+            "size_bytes, doc_type, extracted_text"
+            ") VALUES " + ", ".join(["(?, ?, ?, ?, ?, ?)"] * n)
+        )
+        _DOC_INSERT_SQL[n] = sql
+    return sql
 
-def insert_documents(transaction_id: str, docs: list[dict]):
-    if not docs:
-        return
 
-    rows = []
+def _insert_document_rows(conn, transaction_id: str, docs: list[dict]):
+    params = []
     for d in docs:
-        rows.append((
+        params.extend((
             transaction_id,
             d.get("filename"),
             d.get("content_type"),
@@ -193,45 +361,259 @@ def insert_documents(transaction_id: str, docs: list[dict]):
             d.get("extracted_text")
         ))
 
-    with db_conn() as conn:
-        conn.executemany("""
-        INSERT INTO claim_documents (
-          transaction_id, filename, content_type,
-          size_bytes, doc_type, extracted_text
-        ) VALUES (?, ?, ?, ?, ?, ?)
-        """, rows)
+    # Take the write lock up front so the whole batch commits as one unit
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+    step = DOC_INSERT_CHUNK * 6
+    for i in range(0, len(params), step):
+        chunk = params[i:i + step]
+        conn.execute(_doc_insert_sql(len(chunk) // 6), chunk)
+
+
+def _has_doc_payload(docs: list[dict]) -> bool:
+    # Entries without a filename or text are placeholders; nothing to store
+    return any(d.get("filename") or d.get("extracted_text") for d in docs)
+
+
+def _register_one(conn, reg_kwargs: dict, docs: list[dict]) -> dict:
+    # Upsert + documents on `conn`; returns the claim's status-cache entry
+    transaction_id = reg_kwargs["transaction_id"]
+    status = dict(_upsert_claim(conn, reg_kwargs))
+    if docs and _has_doc_payload(docs):
+        _insert_document_rows(conn, transaction_id, docs)
+    status["documents_uploaded"] = conn.execute(
+        _DOC_COUNT_SQL, (transaction_id,)
+    ).fetchone()[0]
+    return status
+
 
+def register_claim_with_docs(reg_kwargs: dict, docs: list[dict]):
+    """Upsert the claim row and insert its documents in one transaction."""
+    transaction_id = reg_kwargs["transaction_id"]
 
-def fetch_claim_and_docs(transaction_id: str):
+    status = _writer.run(lambda conn: _register_one(conn, reg_kwargs, docs))
+    invalidate_claim_cache(transaction_id)
+    _status_put(transaction_id, status)
+
+
+def register_claims_bulk(entries: list[tuple[dict, list[dict]]]):
+    """
+    register_claim_with_docs for many (reg_kwargs, docs) pairs, all in one
+    transaction: the writer lock is taken and committed once per batch.
+    """
+    statuses = _writer.run(lambda conn: [_register_one(conn, r, d) for r, d in entries])
+    for status in statuses:
+        invalidate_claim_cache(status["transaction_id"])
+        _status_put(status["transaction_id"], status)
+
+
+def persist_registration(transaction_id: str, docs: list[dict], **fields):
+    """Insert an existing claim's documents and update its fields in one transaction."""
+    keys = tuple(sorted(fields))
+    vals = [fields[k] for k in keys] + [transaction_id]
+
+    def write(conn):
+        if docs and _has_doc_payload(docs):
+            _insert_document_rows(conn, transaction_id, docs)
+        if keys:
+            conn.execute(_update_claim_sql(keys), vals)
+
+    _writer.run(write)
+    invalidate_claim_cache(transaction_id)
+
+
+# Deprecated: prefer register_claim_with_docs (one commit for claim + docs)
+def upsert_claim_registration(**kwargs):
+    _writer.run(lambda conn: _upsert_claim(conn, kwargs))
+    invalidate_claim_cache(kwargs["transaction_id"])
+
+
+# Deprecated: prefer register_claim_with_docs (one commit for claim + docs)
+def insert_documents(transaction_id: str, docs: list[dict]):
+    if not docs or not _has_doc_payload(docs):
+        return
+
+    _writer.run(lambda conn: _insert_document_rows(conn, transaction_id, docs))
+    invalidate_claim_cache(transaction_id)
+
+
+_DOC_COUNT_SQL = "SELECT COUNT(*) FROM claim_documents WHERE transaction_id=?"
+
+_STATUS_SQL = f"""
+    SELECT transaction_id, claim_id, policy_number, status, registered_at, final_decision,
+           ({_DOC_COUNT_SQL}) AS documents_uploaded
+    FROM claims
+    WHERE transaction_id=?
+"""
+
+
+def fetch_claim_status(transaction_id: str):
+    """
+    Status columns plus the document count for one claim (None if unknown),
+    served from the status cache when possible.
+    """
+    status = _status_get(transaction_id)
+    if status is None:
+        generation = _cache_generation(transaction_id)
+        with db_conn() as conn:
+            rows = rows_as_dicts(conn.execute(_STATUS_SQL, (transaction_id, transaction_id)))
+        if not rows:
+            return None
+        status = rows[0]
+        _status_put(transaction_id, status, generation)
+    return dict(status)
+
+
+_DOCS_SQL = """
+    SELECT id, filename, content_type,
+           size_bytes, doc_type
+    FROM claim_documents
+    WHERE transaction_id=?
+    ORDER BY id ASC
+"""
+_DOCS_WITH_TEXT_SQL = """
+    SELECT id, filename, content_type,
+           size_bytes, doc_type, extracted_text
+    FROM claim_documents
+    WHERE transaction_id=?
+    ORDER BY id ASC
+"""
+
+
+def fetch_claim_and_docs(transaction_id: str, include_text: bool = False):
+    """
+    Return (claim, docs) as dicts. Document `extracted_text` is only read
+    when include_text=True; status-style callers skip the OCR payloads.
+    """
+    cached = _cache_get(transaction_id)
+    if cached is not None:
+        claim, docs, has_text = cached
+        if has_text or not include_text:
+            # Hand out copies so callers can't mutate the cached rows
+            return dict(claim), [dict(d) for d in docs]
+
+    generation = _cache_generation(transaction_id)
     with db_conn() as conn:
-        c = conn.execute(
+        claims = rows_as_dicts(conn.execute(
             "SELECT * FROM claims WHERE transaction_id=?",
             (transaction_id,)
-        ).fetchone()
+        ))
 
-        if not c:
+        if not claims:
             return None, []
 
-        docs = conn.execute("""
-            SELECT id, filename, content_type,
-                   size_bytes, doc_type, extracted_text
-            FROM claim_documents
-            WHERE transaction_id=?
-            ORDER BY id ASC
-        """, (transaction_id,)).fetchall()
+        claim = claims[0]
+        docs = rows_as_dicts(conn.execute(
+            _DOCS_WITH_TEXT_SQL if include_text else _DOCS_SQL,
+            (transaction_id,)
+        ))
+
+    _cache_put(transaction_id, (claim, docs, include_text), generation)
+    return dict(claim), [dict(d) for d in docs]
+
 
-        return dict(c), [dict(d) for d in docs]
+@lru_cache(maxsize=64)
+def _update_claim_sql(cols: tuple) -> str:
+    # Same column set → same SQL text, so sqlite3's statement cache reuses it
+    return f"UPDATE claims SET {', '.join(f'{c}=?' for c in cols)} WHERE transaction_id=?"
 
 
 def update_claim_fields(transaction_id: str, **fields):
     if not fields:
         return
 
-    cols = ", ".join([f"{k}=?" for k in fields.keys()])
-    vals = list(fields.values()) + [transaction_id]
+    keys = tuple(sorted(fields))
+    vals = [fields[k] for k in keys] + [transaction_id]
+
+    _writer.run(lambda conn: conn.execute(_update_claim_sql(keys), vals))
+    invalidate_claim_cache(transaction_id)
+
 
+_UPDATE_DECISION_SQL = (
+    "UPDATE claims SET final_decision=?, status=?, updated_at=? "
+    "WHERE transaction_id=? RETURNING transaction_id, final_decision, updated_at"
+)
+
+
+def update_decision(transaction_id: str, decision: str, updated_at: str):
+    """
+    Record a manager decision (final_decision and status) in one statement.
+    Returns the updated (transaction_id, final_decision, updated_at) as a
+    dict, or None if the claim does not exist.
+    """
+    row = _writer.run(
+        lambda conn: conn.execute(
+            _UPDATE_DECISION_SQL, (decision, decision, updated_at, transaction_id)
+        ).fetchone()
+    )
+    invalidate_claim_cache(transaction_id)
+    return dict(row) if row else None
+
+
+# Keeps each IN (...) well under SQLite's bound-parameter limit
+FETCH_IN_CHUNK = 500
+
+
+def fetch_claims(transaction_ids: list[str]) -> dict:
+    """Claim rows (no documents) for many transactions, keyed by transaction_id."""
+    ids = list(dict.fromkeys(transaction_ids))
+    out = {}
     with db_conn() as conn:
-        conn.execute(
-            f"UPDATE claims SET {cols} WHERE transaction_id=?",
-            vals
-        )
+        for i in range(0, len(ids), FETCH_IN_CHUNK):
+            chunk = ids[i:i + FETCH_IN_CHUNK]
+            rows = rows_as_dicts(conn.execute(
+                f"SELECT * FROM claims WHERE transaction_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ))
+            for r in rows:
+                out[r["transaction_id"]] = r
+    return out
+
+
+def update_claims_fields(updates: list[tuple[str, dict]]):
+    """
+    Several update_claim_fields in one transaction. Updates touching the
+    same columns share one executemany.
+    """
+    groups = {}
+    for transaction_id, fields in updates:
+        if not fields:
+            continue
+        keys = tuple(sorted(fields))
+        groups.setdefault(keys, []).append([fields[k] for k in keys] + [transaction_id])
+    if not groups:
+        return
+
+    def write(conn):
+        for keys, rows in groups.items():
+            conn.executemany(_update_claim_sql(keys), rows)
+
+    _writer.run(write)
+    for transaction_id, _ in updates:
+        invalidate_claim_cache(transaction_id)
+
+
+# ============================================================
+# ASYNC WRAPPERS
+# ============================================================
+# For `async def` handlers: the pooled calls above run in a worker thread so
+# SQLite I/O doesn't block the event loop (WAL lets those readers overlap).
+async def async_fetch_claim_and_docs(transaction_id: str, include_text: bool = False):
+    return await asyncio.to_thread(fetch_claim_and_docs, transaction_id, include_text)
+
+
+async def async_update_claim_fields(transaction_id: str, **fields):
+    await asyncio.to_thread(update_claim_fields, transaction_id, **fields)
+
+
+async def async_fetch_claim_status(transaction_id: str):
+    # Cache hits are answered inline; only a miss pays the thread hop
+    status = _status_get(transaction_id)
+    if status is not None:
+        return dict(status)
+    return await asyncio.to_thread(fetch_claim_status, transaction_id)
+
+
+async def async_update_decision(transaction_id: str, decision: str, updated_at: str):
+    return await asyncio.to_thread(update_decision, transaction_id, decision, updated_at)
@@ -0,0 +1,86 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+
+# ============================================================
+# BACKGROUND WRITER (group commit)
+# ============================================================
+# Write callables are queued to one daemon thread, which drains up to
+# MAX_BATCH of them per tick and runs them inside a single transaction:
+#
+#     caller → submit(fn) → queue → writer thread → BEGIN IMMEDIATE
+#                                                    fn1(conn), fn2(conn), …
+#                                                   COMMIT → futures
+#
+# Each callable runs under its own SAVEPOINT, so one failing write is rolled
+# back (and raised to its caller) without discarding the rest of the batch.
+
+MAX_BATCH = 64
+
+
+class BackgroundWriter:
+
+    def __init__(self, db_conn: Callable, name: str = "sqlite-writer"):
+        self._db_conn = db_conn
+        self._name = name
+        self._queue: "queue.Queue[Tuple[Callable, Future]]" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[Tuple[Callable, Future]]:
+        batch = [self._queue.get()]
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            results = []
+            try:
+                with self._db_conn() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for fn, fut in batch:
+                        conn.execute("SAVEPOINT write")
+                        try:
+                            results.append((fut, True, fn(conn)))
+                            conn.execute("RELEASE write")
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO write")
+                            conn.execute("RELEASE write")
+                            results.append((fut, False, e))
+            except Exception as e:
+                # Commit (or BEGIN) failed: nothing in this batch was written
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            for fut, ok, value in results:
+                if ok:
+                    fut.set_result(value)
+                else:
+                    fut.set_exception(value)
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        """Queue `fn(conn)` for the next group commit."""
+        self._ensure_thread()
+        fut: Future = Future()
+        self._queue.put((fn, fut))
+        return fut
+
+    def run(self, fn: Callable[[Any], Any]) -> Any:
+        """Queue `fn(conn)` and wait until its batch has committed."""
+        return self.submit(fn).result()
@@ -1,3 +1,4 @@
+import logging
 from langgraph.graph import StateGraph, END
 from backend.state.claim_state import ClaimState
 from backend.utils.logger import logger
@@ -11,20 +12,21 @@ manager_agent = ManagerAgent()
 def manager_node(state: ClaimState):
     return manager_agent.run(state)
 
+# (predicate on router_decision, target, log level, message); first match wins
+_ROUTER_ROUTES = (
+    (lambda d: d is None, "manager", logging.WARNING, "[Router] No decision found — sending to manager"),
+    (lambda d: d.need_documents, "manager", logging.INFO, "[Router] Missing documents → Manager"),
+    (lambda d: d.fraud_check, "fraud", logging.INFO, "[Router] Fraud check required"),
+    (lambda d: d.manual_review, "manager", logging.INFO, "[Router] Manual review required"),
+)
+
 def route_after_router(state: ClaimState):
     decision = state.router_decision
-    if decision is None:
-        logger.warning("[Router] No decision found — sending to manager")
-        return "manager"
-    if decision.need_documents:
-        logger.info("[Router] Missing documents → Manager")
-        return "manager"
-    if decision.fraud_check:
-        logger.info("[Router] Fraud check required")
-        return "fraud"
-    if decision.manual_review:
-        logger.info("[Router] Manual review required")
-        return "manager"
+    for predicate, target, level, message in _ROUTER_ROUTES:
+        if predicate(decision):
+            if logger.isEnabledFor(level):
+                logger.log(level, message)
+            return target
     return "manager"
 
 def build_claim_graph(return_uncompiled: bool = False):
@@ -4,7 +4,7 @@ Claim Graph v3
 ==============
 Real-world claims flow using LangGraph:
 
-    register → validate (LLM) → fraud (LLM + fallback) → (investigator?) → manager → END
+    register → assess [validate (LLM) ∥ fraud (LLM + fallback)] → (investigator?) → manager → END
 
 Nodes:
 - registration_agent:
@@ -21,6 +21,10 @@ Nodes:
     • Computes fraud_score via LLM, with rule-based fallback on quota/errors
     • Sets fraud_checked, fraud_score [0..1], fraud_decision in {"SAFE","SUSPECT"}
 
+- assess (validate_and_fraud_node):
+    • Runs llm_validation_agent and fraud_agent concurrently (both only read
+      the claim inputs) and merges their results into one state
+
 - investigator_agent:
     • Assigns investigator on high risk (fraud_score) or large amount
     • Sets state.assignment.{investigator_id, sla_days, reason}
@@ -35,6 +39,8 @@ Exports:
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Literal
 
 # LangGraph core
@@ -52,8 +58,6 @@ from backend.state.claim_state import ClaimState
 try:
     from backend.utils.logger import logger
 except Exception:
-    import logging
-
     logger = logging.getLogger("claim_graph_v3")
     if not logger.handlers:
         handler = logging.StreamHandler()
@@ -85,31 +89,77 @@ def manager_node(state: ClaimState) -> ClaimState:
     return _manager.run(state)
 
 
+# -----------------------------------------------------------------------------
+# Parallel assessment node (validation ∥ fraud)
+# -----------------------------------------------------------------------------
+async def validate_and_fraud_node(state: ClaimState) -> ClaimState:
+    """
+    Validation and fraud scoring only read amount/extracted_text/documents, so
+    their LLM calls overlap on separate copies of the state and the fraud
+    fields are merged onto the validated copy.
+    """
+    validated, scored = await asyncio.gather(
+        asyncio.to_thread(llm_validation_agent, state.model_copy(deep=True)),
+        asyncio.to_thread(fraud_agent, state.model_copy(deep=True)),
+    )
+    validated.fraud_checked = scored.fraud_checked
+    validated.fraud_score = scored.fraud_score
+    validated.fraud_decision = scored.fraud_decision
+    return validated
+
+
 # -----------------------------------------------------------------------------
 # Routing functions
 # -----------------------------------------------------------------------------
+# Each table is scanned in order; the first matching predicate wins, otherwise
+# the default applies. Entries are (predicate, target, log message).
+_VALIDATION_ROUTES = (
+    (lambda s: not s.validation.docs_ok or bool(s.validation.errors),
+     "manager", "[Router] Validation NOT OK → Manager"),
+)
+_VALIDATION_DEFAULT = ("fraud", "[Router] Validation OK → Fraud")
+
+_FRAUD_ROUTES = (
+    (lambda s: s.fraud_score >= FRAUD_ESCALATION_THRESHOLD
+     or float(s.amount or 0.0) > HIGH_AMOUNT_THRESHOLD,
+     "investigator", "[Router] High risk/amount → Investigator"),
+)
+_FRAUD_DEFAULT = ("manager", "[Router] Acceptable risk → Manager")
+
+
+def _dispatch(state: ClaimState, routes, default) -> str:
+    for predicate, target, message in routes:
+        if predicate(state):
+            break
+    else:
+        target, message = default
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(message)
+    return target
+
+
 def route_after_validation(state: ClaimState) -> Literal["manager", "fraud"]:
     """
     If documents are missing or there are validation errors → Manager (likely PENDING/REJECTED).
     Otherwise → Fraud.
     """
-    if not state.validation.docs_ok or state.validation.errors:
-        logger.info("[Router] Validation NOT OK → Manager")
-        return "manager"
-    logger.info("[Router] Validation OK → Fraud")
-    return "fraud"
+    return _dispatch(state, _VALIDATION_ROUTES, _VALIDATION_DEFAULT)
 
 
 def route_after_fraud(state: ClaimState) -> Literal["investigator", "manager"]:
     """
     After fraud scoring: high-risk or high-amount → Investigator; otherwise → Manager.
     """
-    amt = float(state.amount or 0.0)
-    if state.fraud_score >= FRAUD_ESCALATION_THRESHOLD or amt > HIGH_AMOUNT_THRESHOLD:
-        logger.info("[Router] High risk/amount → Investigator")
-        return "investigator"
-    logger.info("[Router] Acceptable risk → Manager")
-    return "manager"
+    return _dispatch(state, _FRAUD_ROUTES, _FRAUD_DEFAULT)
+
+
+def route_after_assessment(state: ClaimState) -> Literal["investigator", "manager"]:
+    """
+    Validation NOT OK → Manager; otherwise apply the fraud routing.
+    """
+    if route_after_validation(state) == "manager":
+        return "manager"
+    return route_after_fraud(state)
 
 
 # -----------------------------------------------------------------------------
@@ -131,8 +181,7 @@ def build_claim_graph_v3(return_uncompiled: bool = False):
 
     # Nodes
     graph.add_node("register", registration_agent)
-    graph.add_node("validate", llm_validation_agent)
-    graph.add_node("fraud", fraud_agent)
+    graph.add_node("assess", validate_and_fraud_node)
     graph.add_node("investigator", investigator_agent)
     graph.add_node("manager", manager_node)
 
@@ -140,22 +189,12 @@ def build_claim_graph_v3(return_uncompiled: bool = False):
     graph.set_entry_point("register")
 
     # Edges
-    graph.add_edge("register", "validate")
-
-    # Validation -> (Manager | Fraud)
-    graph.add_conditional_edges(
-        "validate",
-        route_after_validation,
-        {
-            "manager": "manager",
-            "fraud": "fraud",
-        },
-    )
+    graph.add_edge("register", "assess")
 
-    # Fraud -> (Investigator | Manager)
+    # Assessment -> (Investigator | Manager)
     graph.add_conditional_edges(
-        "fraud",
-        route_after_fraud,
+        "assess",
+        route_after_assessment,
         {
             "investigator": "investigator",
             "manager": "manager",
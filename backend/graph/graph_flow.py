@@ -8,10 +8,51 @@ from backend.state.claim_state import ClaimState
 from backend.agents.registration_agent import registration_agent
 from backend.agents.llm_validation_agent import llm_validation_agent
 from backend.agents.fraud_agent import fraud_agent
-from backend.agents.investigator_agent import investigator_agent
+from backend.agents.investigator_agent import assign_and_persist
 from backend.agents.manager_agent import ManagerAgent
 
 
+# ----------------------------
+# Inline steps (no dedicated agent)
+# ----------------------------
+def _decision_step(state: ClaimState) -> ClaimState:
+    # Simple auto decision logic
+    if state.claim_validated and state.fraud_decision == "SAFE":
+        state.claim_approved = True
+    else:
+        state.claim_approved = False
+
+    state.claim_decision_made = True
+    state.logs.append(
+        f"[decision] approved={state.claim_approved}"
+    )
+    return state
+
+
+def _payment_step(state: ClaimState) -> ClaimState:
+    state.payment_processed = True
+    state.logs.append("[payment] processed")
+    return state
+
+
+def _closure_step(state: ClaimState) -> ClaimState:
+    state.claim_closed = True
+    state.logs.append("[closure] claim closed")
+    return state
+
+
+# Manager decision → step function
+_DISPATCH = {
+    "registration_agent": registration_agent,
+    "validation_agent": llm_validation_agent,
+    "fraud_agent": fraud_agent,
+    "investigator_agent": assign_and_persist,
+    "decision_agent": _decision_step,
+    "payment_agent": _payment_step,
+    "closure_agent": _closure_step,
+}
+
+
 def run_claim_flow(initial_state: ClaimState) -> ClaimState:
     """
     Executes full claim lifecycle sequentially
@@ -27,44 +68,15 @@ def run_claim_flow(initial_state: ClaimState) -> ClaimState:
 
         state.logs.append(f"[manager] routing → {decision}")
 
-        if decision == "registration_agent":
-            state = registration_agent(state)
-
-        elif decision == "validation_agent":
-            state = llm_validation_agent(state)
-
-        elif decision == "fraud_agent":
-            state = fraud_agent(state)
-
-        elif decision == "investigator_agent":
-            state = investigator_agent(state)
-
-        elif decision == "decision_agent":
-            # Simple auto decision logic
-            if state.claim_validated and state.fraud_decision == "SAFE":
-                state.claim_approved = True
-            else:
-                state.claim_approved = False
+        step = _DISPATCH.get(decision)
+        if step is not None:
+            state = step(state)
+            continue
 
-            state.claim_decision_made = True
-            state.logs.append(
-                f"[decision] approved={state.claim_approved}"
-            )
-
-        elif decision == "payment_agent":
-            state.payment_processed = True
-            state.logs.append("[payment] processed")
-
-        elif decision == "closure_agent":
-            state.claim_closed = True
-            state.logs.append("[closure] claim closed")
-
-        elif decision == "end":
+        if decision == "end":
             state.logs.append("[flow] completed")
-            break
-
         else:
             state.logs.append(f"[flow] unknown step {decision}")
-            break
+        break
 
     return state
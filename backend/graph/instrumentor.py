@@ -1,6 +1,7 @@
 # backend/graph/instrumentor.py
 import asyncio
-from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from langgraph.graph import StateGraph
 from backend.state.claim_state import ClaimState
 
@@ -9,11 +10,47 @@ RESERVED_PREFIX = "__"  # internal nodes like __start__, __end__
 def _is_reserved(name: str) -> bool:
     return isinstance(name, str) and name.startswith(RESERVED_PREFIX)
 
-def instrument_graph(original_graph, events: List[Dict[str, Any]]) -> StateGraph:
+@dataclass(slots=True)
+class NodeEvent:
+    type: str                      # "node_start" | "node_end" | "error"
+    node: str
+    snapshot: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+def _wrap_node(name: str, node_fn, events: Deque[NodeEvent]):
+    """
+    Record node_start/node_end/error around `node_fn`. Sync nodes get a sync
+    wrapper so LangGraph doesn't route them through the async scheduler.
+    """
+    if asyncio.iscoroutinefunction(node_fn):
+        async def wrapped(state):
+            events.append(NodeEvent("node_start", name, _safe_snapshot(state)))
+            try:
+                res = await node_fn(state)
+                events.append(NodeEvent("node_end", name, _safe_snapshot(res)))
+                return res
+            except Exception as e:
+                events.append(NodeEvent("error", name, error=f"{type(e).__name__}: {e}"))
+                raise
+    else:
+        def wrapped(state):
+            events.append(NodeEvent("node_start", name, _safe_snapshot(state)))
+            try:
+                res = node_fn(state)
+                events.append(NodeEvent("node_end", name, _safe_snapshot(res)))
+                return res
+            except Exception as e:
+                events.append(NodeEvent("error", name, error=f"{type(e).__name__}: {e}"))
+                raise
+
+    return wrapped
+
+def instrument_graph(original_graph, events: Deque[NodeEvent]) -> StateGraph:
     """
     Works with BOTH uncompiled and compiled graphs.
 
     - Wraps each non-reserved node and records node_start/node_end/error
+      as NodeEvent records appended to `events` (a collections.deque)
     - Rebuilds a new StateGraph with only non-reserved nodes
     - Filters edges/conditional edges that reference reserved nodes
     """
@@ -31,19 +68,7 @@ def instrument_graph(original_graph, events: List[Dict[str, Any]]) -> StateGraph
         if _is_reserved(name):
             continue
 
-        async def wrapped(state, _fn=node_fn, _name=name):
-            events.append({"type": "node_start", "node": _name, "snapshot": _safe_snapshot(state)})
-            try:
-                res = _fn(state)
-                if asyncio.iscoroutine(res):
-                    res = await res
-                events.append({"type": "node_end", "node": _name, "snapshot": _safe_snapshot(res)})
-                return res
-            except Exception as e:
-                events.append({"type": "error", "node": _name, "error": f"{type(e).__name__}: {e}"})
-                raise
-
-        g.add_node(name, wrapped)
+        g.add_node(name, _wrap_node(name, node_fn, events))
         added.add(name)
 
     # 2) Entry point (only if not reserved)
@@ -93,18 +118,28 @@ def instrument_graph(original_graph, events: List[Dict[str, Any]]) -> StateGraph
 
     return g
 
+_SNAPSHOT_KEYS = (
+    "claim_id", "customer_name", "policy_number",
+    "amount", "extracted_text",
+    "claim_registered", "claim_validated",
+    "router_decision", "fraud_checked", "fraud_score", "fraud_decision",
+    "final_decision"
+)
+_MISSING = object()
+
 def _safe_snapshot(state: Any) -> Dict[str, Any]:
-    try:
-        d = state.model_dump()  # pydantic v2
-    except Exception:
-        d = getattr(state, "dict", lambda: state.__dict__)()
-    if isinstance(d.get("extracted_text"), str) and len(d["extracted_text"]) > 240:
-        d["extracted_text"] = d["extracted_text"][:240] + "…"
-    keep = [
-        "claim_id", "customer_name", "policy_number",
-        "amount", "extracted_text",
-        "claim_registered", "claim_validated",
-        "router_decision", "fraud_checked", "fraud_score", "fraud_decision",
-        "final_decision"
-    ]
-    return {k: d.get(k) for k in keep if k in d}
\ No newline at end of file
+    # Read only the allowlisted fields instead of dumping the whole state
+    if isinstance(state, dict):
+        get = state.get
+    else:
+        get = lambda k, default: getattr(state, k, default)
+
+    d = {}
+    for k in _SNAPSHOT_KEYS:
+        v = get(k, _MISSING)
+        if v is not _MISSING:
+            d[k] = v
+    et = d.get("extracted_text")
+    if isinstance(et, str) and len(et) > 240:
+        d["extracted_text"] = et[:240] + "…"
+    return d
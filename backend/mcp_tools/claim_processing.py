@@ -0,0 +1,93 @@
+"""
+Claim processing shared by the MCP servers
+-------------------------------------------
+Rebuilds a ClaimState from a claims row, runs claim_graph_v3 on it, and
+processes many transactions at once for the batch tools.
+"""
+
+import asyncio
+import os
+from contextlib import nullcontext
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+# Optional: aiolimiter caps how many claims start per minute
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+from backend.state.claim_state import ClaimState
+from backend.db.sqlite_store import fetch_claims, update_claim_fields, update_claims_fields
+from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.utils.logger import logger
+
+# Decisions a manager may record through ManagerDecisionTool
+ALLOWED_DECISIONS = frozenset({"APPROVED", "REJECTED", "PENDING_DOCUMENTS"})
+
+BATCH_CONCURRENCY = 8
+
+# Claims started per minute by the batch tools. This paces whole graph runs,
+# not LLM calls: each claim issues several prompts (validation, fraud, ...).
+BATCH_CLAIMS_PER_MINUTE = int(os.getenv("BATCH_CLAIMS_PER_MINUTE", "60"))
+_claim_rate = AsyncLimiter(BATCH_CLAIMS_PER_MINUTE, 60) if AsyncLimiter is not None else None
+
+# (claim row) -> (tool response, claim fields to persist)
+ProcessFn = Callable[[dict], Awaitable[Tuple[Dict, Dict]]]
+
+
+async def run_claim_graph(claim: dict):
+    """Run claim_graph_v3 on a claims row; returns the graph's final state."""
+    # DB rows are already typed, so skip validation
+    state = ClaimState.model_construct(
+        transaction_id=claim["transaction_id"],
+        claim_id=claim["claim_id"],
+        customer_name=claim["customer_name"],
+        policy_number=claim["policy_number"],
+        amount=claim["amount"],
+        claim_type=claim["claim_type"],
+        extracted_text=claim["extracted_text"],
+        claim_registered=True,
+        registered_at=claim["registered_at"]
+    )
+    return await claim_graph_v3.ainvoke(state)
+
+
+async def process_claims_batch(transaction_ids: List[str], process: ProcessFn) -> List[Dict]:
+    """
+    Run `process` for every known transaction (at most BATCH_CONCURRENCY at a
+    time), persist all successful runs in one transaction, and return one
+    result per requested id, in order.
+    """
+    claims = await asyncio.to_thread(fetch_claims, transaction_ids)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def one(tid):
+        async with sem, (_claim_rate or nullcontext()):
+            return await process(claims[tid])
+
+    found = [tid for tid in dict.fromkeys(transaction_ids) if tid in claims]
+    outcomes = dict(zip(found, await asyncio.gather(*(one(t) for t in found), return_exceptions=True)))
+
+    updates = [(tid, o[1]) for tid, o in outcomes.items() if not isinstance(o, BaseException)]
+    try:
+        await asyncio.to_thread(update_claims_fields, updates)
+    except Exception as e:
+        # One bad row rolls back the whole batch: retry row by row so the
+        # good ones are kept and only the failing ones report an error
+        logger.error("[batch] bulk write failed, retrying per row: %s", e)
+        for tid, fields in updates:
+            try:
+                await asyncio.to_thread(update_claim_fields, tid, **fields)
+            except Exception as row_err:
+                outcomes[tid] = row_err
+
+    results = []
+    for tid in transaction_ids:
+        o = outcomes.get(tid)
+        if tid not in claims:
+            results.append({"transaction_id": tid, "status": "error", "error": "Claim not found"})
+        elif isinstance(o, BaseException):
+            results.append({"transaction_id": tid, "status": "error", "error": f"{type(o).__name__}: {o}"})
+        else:
+            results.append({"status": "ok", **o[0]})
+    return results
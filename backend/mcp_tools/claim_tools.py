@@ -1,11 +1,14 @@
-from backend.state.claim_state import ClaimState
+import asyncio
+
+from backend.state.claim_state import ClaimState, DocumentRecord, ValidationResult, Assignment
 
 from backend.agents.registration_agent import registration_agent
 from backend.agents.validation_agent import validation_agent
 from backend.agents.llm_validation_agent import llm_validation_agent
 from backend.agents.fraud_agent import fraud_agent
-from backend.agents.investigator_agent import investigator_agent
+from backend.agents.investigator_agent import assign_and_persist
 from backend.agents.manager_agent import ManagerAgent
+from backend.utils.safe_json import json_loads
 
 
 # ---------------------------------------------------
@@ -13,7 +16,29 @@ from backend.agents.manager_agent import ManagerAgent
 # ---------------------------------------------------
 
 def _serialize(state: ClaimState):
-    return state.model_dump()
+    # JSON-ready dict: pydantic-core's JSON serializer + orjson parse, instead
+    # of model_dump() followed by another serialization at the transport
+    return json_loads(state.model_dump_json())
+
+
+def _deserialize(data: dict) -> ClaimState:
+    """
+    Inverse of _serialize for peer-tool payloads: already validated, so the
+    state (and nested models) are rebuilt with model_construct.
+    """
+    fields = dict(data)
+
+    if "documents" in fields:
+        fields["documents"] = [
+            d if isinstance(d, DocumentRecord) else DocumentRecord.model_construct(**d)
+            for d in fields["documents"] or []
+        ]
+    if isinstance(fields.get("validation"), dict):
+        fields["validation"] = ValidationResult.model_construct(**fields["validation"])
+    if isinstance(fields.get("assignment"), dict):
+        fields["assignment"] = Assignment.model_construct(**fields["assignment"])
+
+    return ClaimState.model_construct(**fields)
 
 
 # ===================================================
@@ -21,6 +46,7 @@ def _serialize(state: ClaimState):
 # ===================================================
 
 def registration_tool(input_data: dict):
+    # Entry point for new claims: keep full validation
     state = ClaimState(**input_data)
     state = registration_agent(state)
     return _serialize(state)
@@ -31,7 +57,7 @@ def registration_tool(input_data: dict):
 # ===================================================
 
 def validation_tool(input_data: dict):
-    state = ClaimState(**input_data)
+    state = _deserialize(input_data)
     state = validation_agent(state)
     return _serialize(state)
 
@@ -41,7 +67,7 @@ def validation_tool(input_data: dict):
 # ===================================================
 
 def llm_validation_tool(input_data: dict):
-    state = ClaimState(**input_data)
+    state = _deserialize(input_data)
     state = llm_validation_agent(state)
     return _serialize(state)
 
@@ -51,7 +77,7 @@ def llm_validation_tool(input_data: dict):
 # ===================================================
 
 def fraud_tool(input_data: dict):
-    state = ClaimState(**input_data)
+    state = _deserialize(input_data)
     state = fraud_agent(state)
     return _serialize(state)
 
@@ -61,8 +87,8 @@ def fraud_tool(input_data: dict):
 # ===================================================
 
 def investigator_tool(input_data: dict):
-    state = ClaimState(**input_data)
-    state = investigator_agent(state)
+    state = _deserialize(input_data)
+    state = assign_and_persist(state)
     return _serialize(state)
 
 
@@ -71,9 +97,41 @@ def investigator_tool(input_data: dict):
 # ===================================================
 
 def manager_tool(input_data: dict):
-    state = ClaimState(**input_data)
+    state = _deserialize(input_data)
 
     manager = ManagerAgent()
     result = manager.run(state)
 
     return result
+
+
+# ===================================================
+# 6️⃣b MANAGER PIPELINE TOOL (validation ∥ fraud → investigator → manager)
+# ===================================================
+
+async def manager_pipeline_tool(input_data: dict):
+    state = _deserialize(input_data)
+
+    # Rule validation, LLM validation and fraud only read the claim inputs,
+    # so they run concurrently on their own copies and are merged after
+    rule_val, llm_val, scored = await asyncio.gather(
+        asyncio.to_thread(validation_agent, state.model_copy(deep=True)),
+        asyncio.to_thread(llm_validation_agent, state.model_copy(deep=True)),
+        asyncio.to_thread(fraud_agent, state.model_copy(deep=True)),
+    )
+
+    state = llm_val
+    if not rule_val.claim_validated:
+        state.claim_validated = False
+        state.final_decision = rule_val.final_decision
+    state.fraud_checked = scored.fraud_checked
+    state.fraud_score = scored.fraud_score
+    state.fraud_decision = scored.fraud_decision
+
+    state = await asyncio.to_thread(assign_and_persist, state)
+
+    manager = ManagerAgent()
+    result = await asyncio.to_thread(manager.run, state)
+
+    return result
+
@@ -0,0 +1,92 @@
+# backend/services/llm_batcher.py
+"""
+LLM Request Batcher
+===================
+Combines prompts submitted concurrently by the agents (validation, fraud,
+router) into a single `llm.batch(...)` dispatch:
+
+    agent threads → submit(prompt) → pending queue → flush thread → llm.batch → futures
+
+A flush happens after BATCH_WINDOW_S seconds or once BATCH_MAX_SIZE prompts
+are pending, whichever comes first. Flushed batches are dispatched on a
+thread pool, so up to BATCH_MAX_INFLIGHT batches are in flight at once and a
+slow call only holds up the prompts in its own batch. Each caller blocks on
+its own future and receives exactly the response (or exception) for its prompt.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple
+
+from backend.services import llm_cache
+from backend.services.llm_client import llm
+
+BATCH_WINDOW_S: float = 0.02
+BATCH_MAX_SIZE: int = 8
+BATCH_MAX_INFLIGHT: int = int(os.getenv("LLM_BATCH_MAX_INFLIGHT", "8"))
+
+_pending: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+_flusher = None
+_flusher_lock = threading.Lock()
+_dispatch_pool = ThreadPoolExecutor(max_workers=BATCH_MAX_INFLIGHT, thread_name_prefix="llm-batch")
+
+
+def _collect_batch() -> List[Tuple[str, Future]]:
+    batch = [_pending.get()]
+    deadline = time.monotonic() + BATCH_WINDOW_S
+
+    while len(batch) < BATCH_MAX_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_pending.get(timeout=remaining))
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def _dispatch(batch: List[Tuple[str, Future]]):
+    prompts = [prompt for prompt, _ in batch]
+    try:
+        responses = llm.batch(prompts, return_exceptions=True)
+    except Exception as e:
+        responses = [e] * len(batch)
+
+    for (prompt, fut), resp in zip(batch, responses):
+        if isinstance(resp, Exception):
+            fut.set_exception(resp)
+        else:
+            llm_cache.put(prompt, resp.content)
+            fut.set_result(resp.content)
+
+
+def _flush_forever():
+    while True:
+        _dispatch_pool.submit(_dispatch, _collect_batch())
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_forever, name="llm-batcher", daemon=True)
+            _flusher.start()
+
+
+def submit(prompt: str) -> str:
+    """Queue a prompt for the next batch and block until its response arrives."""
+    cached = llm_cache.get(prompt)
+    if cached is not None:
+        return cached
+
+    _ensure_flusher()
+    fut: Future = Future()
+    _pending.put((prompt, fut))
+    return fut.result()
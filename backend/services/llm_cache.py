@@ -0,0 +1,53 @@
+# backend/services/llm_cache.py
+"""
+LLM Response Cache
+==================
+Exact-match cache in front of the Gemini client:
+
+    prompt → exact (sha256 → response, LRU, LLM_CACHE_SIZE entries) → LLM
+
+Only exact matches are reused: the agents' templated prompts differ only in
+claim data (amounts, names, OCR text), so a similarity match would hand one
+claim another claim's verdict.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+
+_exact: "OrderedDict[bytes, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _digest(prompt: str) -> bytes:
+    return hashlib.sha256(prompt.encode("utf-8")).digest()
+
+
+# -----------------------------------------------------------------------------
+# Public API
+# -----------------------------------------------------------------------------
+def get(prompt: str) -> Optional[str]:
+    key = _digest(prompt)
+    with _lock:
+        hit = _exact.get(key)
+        if hit is not None:
+            _exact.move_to_end(key)
+            return hit
+    return None
+
+
+def put(prompt: str, response: str):
+    if not isinstance(response, str) or not response:
+        return
+
+    key = _digest(prompt)
+    with _lock:
+        _exact[key] = response
+        _exact.move_to_end(key)
+        while len(_exact) > LLM_CACHE_SIZE:
+            _exact.popitem(last=False)
+
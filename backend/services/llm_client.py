@@ -1,5 +1,6 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
+from backend.services import llm_cache
 import os
 
 load_dotenv()
@@ -14,6 +15,15 @@ llm = ChatGoogleGenerativeAI(
     credentials=api_key  # Pass the key explicitly
 )
 
+def warm_up():
+    """Prime the Gemini client (auth + connection) with a cheap token count."""
+    llm.get_num_tokens("ping")
+
+
 def llm_response(prompt: str) -> str:
+    cached = llm_cache.get(prompt)
+    if cached is not None:
+        return cached
     response = llm.invoke(prompt)
+    llm_cache.put(prompt, response.content)
     return response.content
@@ -0,0 +1,18 @@
+import time
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") — strftime runs once per second
+_last = (-1, "")
+
+
+def utcnow_iso() -> str:
+    """
+    Current UTC time as ISO-8601 with microseconds and "+00:00", same as
+    datetime.now(timezone.utc).isoformat() but built from time.time_ns().
+    """
+    global _last
+    s, ns = divmod(time.time_ns(), 1_000_000_000)
+    sec, prefix = _last
+    if s != sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s))
+        _last = (s, prefix)
+    return f"{prefix}.{ns // 1000:06d}+00:00"
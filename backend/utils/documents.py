@@ -1,15 +1,54 @@
+import re
+
+# Optional: pyahocorasick (C automaton); a compiled regex is used otherwise
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Checked in this order; the first doc_type with any keyword hit wins
+_RULES = (
+    ("itemized_invoice", ("invoice", "bill"), ("gst", "total")),
+    ("payment_receipt", ("receipt", "payment"), ("paid on", "receipt")),
+    ("fir", ("fir",), ("first information report", "police station")),
+    ("discharge_summary", ("discharge",), ("admission date", "discharge date")),
+    ("id_proof", ("id", "aadhaar", "pan"), ("passport",)),
+)
+
+
+def _build_matcher(keywords_by_rank):
+    """
+    Return `match(s) -> set of ranks` that finds every keyword in one pass.
+    `keywords_by_rank` is a list of (rank, keywords).
+    """
+    rank_of = {}
+    for rank, keywords in keywords_by_rank:
+        for kw in keywords:
+            rank_of.setdefault(kw, rank)
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for kw, rank in rank_of.items():
+            automaton.add_word(kw, rank)
+        automaton.make_automaton()
+        return lambda s: {rank for _, rank in automaton.iter(s)} if s else set()
+
+    # Zero-width lookahead so overlapping keywords are all reported
+    alternation = "|".join(sorted(map(re.escape, rank_of), key=len, reverse=True))
+    pattern = re.compile(f"(?=({alternation}))")
+    return lambda s: {rank_of[m.group(1)] for m in pattern.finditer(s)}
+
+
+_match_name = _build_matcher([(i, rule[1]) for i, rule in enumerate(_RULES)])
+_match_text = _build_matcher([(i, rule[2]) for i, rule in enumerate(_RULES)])
+
+
 def classify_document(filename: str, content_type: str, text: str) -> str:
     t = (text or "").lower()
     name = (filename or "").lower()
 
-    if "invoice" in name or "bill" in name or "gst" in t or "total" in t:
-        return "itemized_invoice"
-    if "receipt" in name or "payment" in name or "paid on" in t or "receipt" in t:
-        return "payment_receipt"
-    if "fir" in name or "first information report" in t or "police station" in t:
-        return "fir"
-    if "discharge" in name or "admission date" in t or "discharge date" in t:
-        return "discharge_summary"
-    if "id" in name or "aadhaar" in name or "pan" in name or "passport" in t:
-        return "id_proof"
-    return "unknown"
\ No newline at end of file
+    ranks = _match_name(name) | _match_text(t)
+    if not ranks:
+        return "unknown"
+    return _RULES[min(ranks)][0]
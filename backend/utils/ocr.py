@@ -1,36 +1,326 @@
 # backend/utils/ocr.py
+import hashlib
 import io
 import os
-from typing import List
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Union
+
+# OCR inputs are either the raw bytes or a path to a file holding them
+Source = Union[bytes, str]
 
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageStat
+
+from backend.utils.documents import classify_document
+
+# Optional: tesserocr keeps the Tesseract engine (and language data) resident
+# instead of spawning the tesseract binary per image
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Optional: PDFium (native) for embedded-text extraction and rasterization;
+# pypdf / PyMuPDF are used when it isn't installed
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Optional: OpenCV adaptive thresholding; routed through UMat (OpenCL, e.g. an
+# integrated GPU) when the build and device support it
+try:
+    import cv2
+    import numpy as np
+    _USE_UMAT = bool(cv2.ocl.haveOpenCL())
+except ImportError:
+    cv2 = None
+    _USE_UMAT = False
+
+# Pages are OCR'd in parallel; keep each Tesseract worker single-threaded so
+# the pool doesn't oversubscribe the CPU (inherited by the tesseract process)
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+
+# -----------------------------
+# OCR result cache (content-hash keyed, SQLite-backed, small in-process LRU
+# in front for duplicates within the same burst of uploads)
+# -----------------------------
+# The on-disk layer holds extracted document text (ID proofs, medical
+# records), so rows expire after OCR_CACHE_TTL_S, the table is trimmed to
+# OCR_CACHE_MAX_ROWS, and OCR_CACHE_PERSIST=0 keeps text in memory only.
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", os.path.join(_PROJECT_ROOT, "data", "ocr_cache.db"))
+OCR_MEMO_SIZE = int(os.getenv("OCR_MEMO_SIZE", "2048"))
+OCR_CACHE_PERSIST = os.getenv("OCR_CACHE_PERSIST", "1").lower() in ("1", "true", "yes")
+OCR_CACHE_TTL_S = float(os.getenv("OCR_CACHE_TTL_S", str(7 * 24 * 3600)))
+OCR_CACHE_MAX_ROWS = int(os.getenv("OCR_CACHE_MAX_ROWS", "20000"))
+# Expired/overflow rows are pruned once every this many inserts
+OCR_CACHE_PRUNE_EVERY = 256
+# OCR_CACHE_DISABLE=1 turns off caching for image uploads (PDFs stay cached)
+OCR_CACHE_DISABLE = os.getenv("OCR_CACHE_DISABLE", "0").lower() in ("1", "true", "yes")
+
+# The lock only guards the in-process memo; SQLite I/O runs outside it on a
+# per-thread connection (WAL: readers don't block each other or the writer)
+_memo: "OrderedDict[str, str]" = OrderedDict()
+_memo_lock = threading.Lock()
+_puts_since_prune = 0
+
+_ocr_cache_local = threading.local()
+_ocr_cache_schema_lock = threading.Lock()
+_ocr_cache_schema_ready = False
+
+
+def _ensure_ocr_cache_schema(conn):
+    global _ocr_cache_schema_ready
+    with _ocr_cache_schema_lock:
+        if _ocr_cache_schema_ready:
+            return
+        conn.execute("PRAGMA journal_mode = WAL;")
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(ocr_cache)")}
+        if cols and "created_at" not in cols:
+            # Pre-TTL table: its rows never expired, so drop them outright
+            conn.execute("DROP TABLE ocr_cache")
+        conn.execute("CREATE TABLE IF NOT EXISTS ocr_cache (key TEXT PRIMARY KEY, text TEXT, created_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_created ON ocr_cache(created_at)")
+        conn.commit()
+        _ocr_cache_schema_ready = True
+
+
+def _ocr_cache():
+    conn = getattr(_ocr_cache_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(OCR_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(OCR_CACHE_PATH)
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        _ensure_ocr_cache_schema(conn)
+        _ocr_cache_local.conn = conn
+    return conn
+
+
+def _prune_ocr_cache(conn):
+    conn.execute("DELETE FROM ocr_cache WHERE created_at < ?", (time.time() - OCR_CACHE_TTL_S,))
+    conn.execute(
+        "DELETE FROM ocr_cache WHERE key IN "
+        "(SELECT key FROM ocr_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+        (OCR_CACHE_MAX_ROWS,)
+    )
+
+
+def _cache_key(data: bytes, kind: str) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest() + ":" + kind
+
+
+def new_content_hash():
+    """Hasher matching the OCR cache keys; feed it while streaming an upload."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def _file_digest(path: str) -> str:
+    h = new_content_hash()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _as_file(src: Source):
+    return io.BytesIO(src) if isinstance(src, (bytes, bytearray)) else src
+
+
+def _memo_put(key: str, text: str):
+    with _memo_lock:
+        _memo[key] = text
+        _memo.move_to_end(key)
+        while len(_memo) > OCR_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def _cache_get(key: str):
+    with _memo_lock:
+        text = _memo.get(key)
+        if text is not None:
+            _memo.move_to_end(key)
+            return text
+    if not OCR_CACHE_PERSIST:
+        return None
+
+    try:
+        row = _ocr_cache().execute(
+            "SELECT text FROM ocr_cache WHERE key=? AND created_at >= ?",
+            (key, time.time() - OCR_CACHE_TTL_S)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row:
+        _memo_put(key, row[0])
+    return row[0] if row else None
+
+
+def _cache_put(key: str, text: str):
+    global _puts_since_prune
+    _memo_put(key, text)
+    if not OCR_CACHE_PERSIST:
+        return
+
+    with _memo_lock:
+        _puts_since_prune += 1
+        prune = _puts_since_prune >= OCR_CACHE_PRUNE_EVERY
+        if prune:
+            _puts_since_prune = 0
+    try:
+        conn = _ocr_cache()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, time.time())
+            )
+            if prune:
+                _prune_ocr_cache(conn)
+    except sqlite3.Error:
+        pass
+
+
+# Concurrent OCR of the same content (a file attached twice, parallel
+# re-uploads) runs once: later callers wait on the key and hit the cache.
+# Entries are ref-counted and dropped when the last caller leaves.
+_inflight: dict = {}
+_inflight_lock = threading.Lock()
+
+
+@contextmanager
+def _single_flight(key: str):
+    with _inflight_lock:
+        entry = _inflight.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _inflight_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _inflight[key]
+
+
+# Tesseract: LSTM engine; PSM 6 ("uniform block of text") fits claim
+# documents, PSM 4 ("single column, variable sizes") fits ID cards
+OCR_OEM = 1
+OCR_PSM_DEFAULT = 6
+OCR_PSM_ID_PROOF = 4
+
+# Rasterization: 220 DPI, lowered per page so the long edge stays <= 2200 px
+# (image uploads, e.g. 4000x3000 phone photos, are downscaled to the same cap)
+OCR_DPI = 220
+OCR_MAX_LONG_EDGE_PX = 2200
+
+
+def _page_dpi(width_pt: float, height_pt: float, dpi: int = OCR_DPI) -> int:
+    long_edge = max(width_pt, height_pt)
+    if long_edge <= 0:
+        return dpi
+    return max(1, min(dpi, int(OCR_MAX_LONG_EDGE_PX * 72 / long_edge)))
+
+
+def _capped_size(size) -> tuple:
+    w, h = size
+    scale = OCR_MAX_LONG_EDGE_PX / max(w, h, 1)
+    if scale >= 1:
+        return w, h
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def _downscale(img: Image.Image) -> Image.Image:
+    """Shrink images whose long edge exceeds OCR_MAX_LONG_EDGE_PX (LSTM cost ~ pixels)."""
+    target = _capped_size(img.size)
+    if target == img.size:
+        return img
+    return img.resize(target, Image.LANCZOS)
+
 
+# Pages whose grayscale stddev is above this are already high-contrast and
+# are OCR'd as-is; adaptive thresholding only pays off on noisy scans
+PREPROCESS_STDDEV_THRESHOLD = 70.0
 
 
 def _preprocess(img: Image.Image) -> Image.Image:
     """Light preprocessing to improve OCR on scans."""
     try:
-        import numpy as np
-        import cv2
-        arr = np.array(img.convert("RGB"))
-        gray = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
+        gray_img = img if img.mode == "L" else img.convert("L")
+        if ImageStat.Stat(gray_img).stddev[0] > PREPROCESS_STDDEV_THRESHOLD:
+            return gray_img
+    except Exception:
+        return img
+    if cv2 is None:
+        return gray_img
+    try:
+        gray = np.asarray(gray_img)
+        if _USE_UMAT:
+            gray = cv2.UMat(gray)
         thr = cv2.adaptiveThreshold(
             gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 2
         )
-        return Image.fromarray(thr)
+        return Image.fromarray(thr.get() if _USE_UMAT else thr)
     except Exception:
         return img
 
 
-def _ocr_pil(img: Image.Image) -> str:
-    return pytesseract.image_to_string(img).strip()
+_tess = threading.local()
+
+
+def _get_tess_api():
+    """One PyTessBaseAPI per thread (the API object is not thread-safe)."""
+    api = getattr(_tess, "api", None)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang="eng", oem=OCR_OEM)
+        _tess.api = api
+    return api
+
+
+def _init_ocr_thread():
+    # Load this thread's engine up front; a failure here must not break the pool
+    if tesserocr is not None:
+        try:
+            _get_tess_api()
+        except Exception:
+            pass
 
 
-def _pdf_text_pypdf(file_bytes: bytes) -> str:
+# PDF pages are OCR'd on one process-wide pool, so its threads — and the
+# PyTessBaseAPI each of them holds — are reused across documents instead of
+# being created (and the LSTM model reloaded) for every PDF.
+_page_pool = ThreadPoolExecutor(
+    max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr-page", initializer=_init_ocr_thread
+)
+
+
+def warm_up():
+    """Load the Tesseract engine + traineddata before the first request."""
+    if tesserocr is not None:
+        _get_tess_api()
+    else:
+        pytesseract.get_tesseract_version()
+
+
+def _ocr_pil(img: Image.Image, psm: int = OCR_PSM_DEFAULT) -> str:
+    if tesserocr is not None:
+        api = _get_tess_api()
+        api.SetPageSegMode(psm)
+        api.SetImage(img)
+        return api.GetUTF8Text().strip()
+    return pytesseract.image_to_string(img, config=f"--oem {OCR_OEM} --psm {psm}").strip()
+
+
+def _pdf_text_pypdf(src: Source) -> str:
     """Extract embedded (selectable) text from PDF using pypdf (no OCR)."""
     from pypdf import PdfReader
-    reader = PdfReader(io.BytesIO(file_bytes))
+    reader = PdfReader(_as_file(src))
     parts: List[str] = []
     for page in reader.pages:
         txt = page.extract_text() or ""
@@ -39,55 +329,179 @@ def _pdf_text_pypdf(file_bytes: bytes) -> str:
     return "\n".join(parts).strip()
 
 
-def _pdf_pages_to_images_pymupdf(file_bytes: bytes, dpi: int = 220) -> List[Image.Image]:
-    """Rasterize PDF pages to images using PyMuPDF (no Poppler needed)."""
+def _pdf_text_pdfium(src: Source) -> str:
+    """Extract embedded (selectable) text from PDF using PDFium (no OCR)."""
+    pdf = pdfium.PdfDocument(src)
+    try:
+        parts: List[str] = []
+        for page in pdf:
+            txt = page.get_textpage().get_text_bounded() or ""
+            if txt.strip():
+                parts.append(txt)
+        return "\n".join(parts).strip()
+    finally:
+        pdf.close()
+
+
+def _pdf_pages_to_images_pdfium(src: Source, dpi: int = OCR_DPI) -> Iterator[Image.Image]:
+    """Rasterize PDF pages to images using PDFium, one page at a time."""
+    pdf = pdfium.PdfDocument(src)
+    try:
+        for page in pdf:
+            yield page.render(scale=_page_dpi(*page.get_size(), dpi=dpi) / 72).to_pil()
+    finally:
+        pdf.close()
+
+
+def _pdf_pages_to_images_pymupdf(src: Source, dpi: int = OCR_DPI) -> Iterator[Image.Image]:
+    """Rasterize PDF pages to images using PyMuPDF (no Poppler needed), one page at a time."""
     import fitz  # PyMuPDF
-    images = []
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    if isinstance(src, (bytes, bytearray)):
+        doc = fitz.open(stream=src, filetype="pdf")
+    else:
+        doc = fitz.open(src, filetype="pdf")
     try:
         for page in doc:
-            mat = fitz.Matrix(dpi / 72, dpi / 72)
+            zoom = _page_dpi(page.rect.width, page.rect.height, dpi=dpi) / 72
+            mat = fitz.Matrix(zoom, zoom)
             pix = page.get_pixmap(matrix=mat, alpha=False)
             img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            images.append(img)
+            del pix
+            yield img
     finally:
         doc.close()
-    return images
 
 
-def ocr_pdf_bytes(file_bytes: bytes) -> str:
+def _ocr_page(img: Image.Image, psm: int = OCR_PSM_DEFAULT) -> str:
+    """OCR one rasterized page, reusing the cached text for identical pixels."""
+    try:
+        key = _cache_key(img.tobytes(), f"page:{img.mode}:{img.width}x{img.height}:psm{psm}")
+        text = _cache_get(key)
+        if text is None:
+            text = _ocr_pil(_preprocess(img), psm=psm)
+            _cache_put(key, text)
+        return text
+    finally:
+        img.close()
+
+
+def _ocr_pages(pages: Iterator[Image.Image], psm: int = OCR_PSM_DEFAULT) -> List[str]:
+    """
+    OCR pages as they are rasterized. At most 2 * OCR_MAX_WORKERS pages are
+    in flight, so long PDFs don't hold every page's pixels at once.
+    """
+    texts: List[str] = []
+    in_flight = deque()
+    for img in pages:
+        if len(in_flight) >= 2 * OCR_MAX_WORKERS:
+            texts.append(in_flight.popleft().result())
+        in_flight.append(_page_pool.submit(_ocr_page, img, psm))
+    while in_flight:
+        texts.append(in_flight.popleft().result())
+    return texts
+
+
+def ocr_pdf_bytes(file_bytes: Source, psm: int = OCR_PSM_DEFAULT) -> str:
     """
     Strategy:
-      1) Try pypdf to extract embedded text (fast & clean).
-      2) If empty/very short => assume scanned PDF; rasterize with PyMuPDF and OCR with Tesseract.
+      1) Try PDFium (or pypdf) to extract embedded text (fast & clean).
+      2) If empty/very short => assume scanned PDF; rasterize with PDFium (or PyMuPDF) and OCR with Tesseract.
     """
-    # 1) pypdf
+    # 1) Embedded text (PDFium when installed, else pypdf)
     try:
-        text = _pdf_text_pypdf(file_bytes)
+        text = _pdf_text_pdfium(file_bytes) if pdfium is not None else _pdf_text_pypdf(file_bytes)
         if len(text.strip()) >= 30:  # heuristic threshold
             return text
     except Exception:
         pass
 
     # 2) OCR fallback
-    pages = _pdf_pages_to_images_pymupdf(file_bytes, dpi=220)
-    texts: List[str] = []
-    for img in pages:
-        pre = _preprocess(img)
-        texts.append(_ocr_pil(pre))
-    return "\n".join(texts).strip()
+    if pdfium is not None:
+        pages = _pdf_pages_to_images_pdfium(file_bytes)
+    else:
+        pages = _pdf_pages_to_images_pymupdf(file_bytes)
+    return "\n".join(_ocr_pages(pages, psm)).strip()
 
 
-def ocr_image_bytes(file_bytes: bytes) -> str:
-    img = Image.open(io.BytesIO(file_bytes))
+def ocr_image_bytes(file_bytes: Source, psm: int = OCR_PSM_DEFAULT) -> str:
+    img = Image.open(_as_file(file_bytes))
+    if img.format == "JPEG":
+        # Let libjpeg decode straight to grayscale at a reduced scale
+        img.draft("L", _capped_size(img.size))
+    img = _downscale(img)
     img = _preprocess(img)
-    return _ocr_pil(img)
+    return _ocr_pil(img, psm=psm)
+
+
+# Uploads that are already text are decoded, never rasterized or OCR'd
+_TEXT_MIMES = frozenset({"application/json", "application/xml", "application/csv"})
+_TEXT_EXTS = frozenset({".txt", ".csv", ".json", ".xml", ".md"})
+
+
+def _is_text_upload(mime: str, ext: str) -> bool:
+    if mime.startswith("text/") or mime in _TEXT_MIMES:
+        return True
+    # Fall back to the extension only when the client sent no useful MIME type
+    return mime in ("", "application/octet-stream") and ext in _TEXT_EXTS
+
+
+def _read_text(src: Source) -> str:
+    if isinstance(src, (bytes, bytearray)):
+        return bytes(src).decode("utf-8", "replace")
+    with open(src, "rb") as fh:
+        return fh.read().decode("utf-8", "replace")
+
+
+def ocr_any(uploaded_bytes: bytes, filename: str = "", content_type: str = "", psm: int = None) -> str:
+    """
+    Auto-detect text vs PDF vs image based on MIME or extension.
+    `psm` defaults from the filename: ID proofs use PSM 4, everything else PSM 6.
+    """
+    return _ocr_any(uploaded_bytes, None, filename, content_type, psm)
+
+
+def ocr_any_path(path: str, filename: str = "", content_type: str = "", psm: int = None,
+                 digest: str = None) -> str:
+    """
+    ocr_any for an upload spooled to disk; the OCR backends read the file
+    directly. `digest` is the new_content_hash() hexdigest of the file, if
+    the caller already computed it while writing.
+    """
+    return _ocr_any(path, digest, filename, content_type, psm)
 
 
-def ocr_any(uploaded_bytes: bytes, filename: str = "", content_type: str = "") -> str:
-    """Auto-detect PDF vs image based on MIME or extension."""
+def _ocr_any(src: Source, digest: str, filename: str, content_type: str, psm: int) -> str:
     ext = os.path.splitext(filename or "")[1].lower()
     mime = (content_type or "").lower()
-    if "pdf" in mime or ext == ".pdf":
-        return ocr_pdf_bytes(uploaded_bytes)
-    return ocr_image_bytes(uploaded_bytes)
\ No newline at end of file
+    if _is_text_upload(mime, ext):
+        return _read_text(src)
+
+    is_pdf = "pdf" in mime or ext == ".pdf"
+    if psm is None:
+        is_id = classify_document(filename, content_type, "") == "id_proof"
+        psm = OCR_PSM_ID_PROOF if is_id else OCR_PSM_DEFAULT
+
+    if OCR_CACHE_DISABLE and not is_pdf:
+        return ocr_image_bytes(src, psm=psm)
+
+    # Identical uploads (retries, re-processing) reuse the cached text
+    kind = f"{'pdf' if is_pdf else 'img'}:psm{psm}"
+    if digest is None:
+        key = _cache_key(src, kind) if isinstance(src, (bytes, bytearray)) else _file_digest(src) + ":" + kind
+    else:
+        key = digest + ":" + kind
+    text = _cache_get(key)
+    if text is not None:
+        return text
+
+    with _single_flight(key):
+        text = _cache_get(key)
+        if text is not None:
+            return text
+
+        if is_pdf:
+            text = ocr_pdf_bytes(src, psm=psm)
+        else:
+            text = ocr_image_bytes(src, psm=psm)
+        _cache_put(key, text)
+    return text
\ No newline at end of file
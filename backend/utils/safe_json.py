@@ -2,9 +2,28 @@ import json
 import re
 from typing import Any, Dict, Optional, Tuple
 
+# Prefer orjson (C parser) when installed; stdlib json otherwise
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj)
+
+# Body is an unrolled loop over "not a fence" runs, so an unclosed fence
+# fails in linear time instead of backtracking through every newline.
 FENCE_RE = re.compile(
-    r"(?:```|~~~)\s*([a-zA-Z0-9_-]+)?\s*\n(.*?)(?:```|~~~)",
-    re.DOTALL
+    r"(?:```|~~~)[ \t]*([a-zA-Z0-9_-]+)?[ \t]*\n"
+    r"([^`~]*(?:(?:`(?!``)|~(?!~~))[^`~]*)*)"
+    r"(?:```|~~~)"
 )
 
 def _extract_from_fence(s: str) -> Optional[str]:
@@ -18,6 +37,10 @@ def _extract_from_fence(s: str) -> Optional[str]:
     content = m.group(2)
     return content.strip()
 
+# Structural tokens only: an escape pair, a quote or a brace. Runs of other
+# characters are skipped by the regex engine instead of a Python loop.
+_SCAN_RE = re.compile(r'\\.|["{}]', re.DOTALL)
+
 def _extract_first_balanced_json(s: str) -> Optional[str]:
     """
     Extract the first top-level balanced JSON object from a string
@@ -26,36 +49,38 @@ def _extract_first_balanced_json(s: str) -> Optional[str]:
     start_idx = None
     depth = 0
     in_string = False
-    escape = False
-    for i, ch in enumerate(s):
+    for m in _SCAN_RE.finditer(s):
+        tok = m.group()
         if in_string:
-            if escape:
-                escape = False
-            elif ch == '\\':
-                escape = True
-            elif ch == '"':
+            if tok == '"':
                 in_string = False
             continue
 
-        if ch == '"':
-            in_string = True
-            continue
+        # Backslashes only escape inside strings; outside, act on the 2nd char
+        pos = m.start()
+        if len(tok) == 2:
+            tok = tok[1]
+            pos += 1
 
-        if ch == '{':
+        if tok == '"':
+            in_string = True
+        elif tok == '{':
             if depth == 0:
-                start_idx = i
+                start_idx = pos
             depth += 1
-        elif ch == '}':
+        elif tok == '}':
             if depth > 0:
                 depth -= 1
                 if depth == 0 and start_idx is not None:
-                    return s[start_idx:i+1]
+                    return s[start_idx:pos+1]
     return None
 
 def _try_json_loads(s: str) -> Optional[Dict[str, Any]]:
+    if not s:
+        return None
     try:
-        return json.loads(s)
-    except json.JSONDecodeError:
+        return json_loads(s)
+    except JSONDecodeError:
         return None
 
 def safe_json_parse(result: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
@@ -73,13 +98,15 @@ def safe_json_parse(result: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
 
     stripped = result.strip()
 
-    # 1) Direct JSON attempt
-    direct = _try_json_loads(stripped)
-    if direct is not None:
-        return direct
+    # 1) Direct JSON attempt (only when it can be an object/array; skips a
+    #    guaranteed decode error for fenced or prose-wrapped responses)
+    if stripped[:1] in ("{", "["):
+        direct = _try_json_loads(stripped)
+        if direct is not None:
+            return direct
 
     # 2) Fenced code block (```json ... ```)
-    fenced = _extract_from_fence(stripped)
+    fenced = _extract_from_fence(stripped) if ("```" in stripped or "~~~" in stripped) else None
     if fenced:
         # a) direct try
         obj = _try_json_loads(fenced)
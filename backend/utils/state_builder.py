@@ -1,13 +1,28 @@
-from backend.state.claim_state import ClaimState
+from backend.state.claim_state import ClaimState, DocumentRecord
+from backend.utils.safe_json import json_dumps, json_loads, JSONDecodeError
 
 
 def build_state_from_db(claim: dict, docs: list) -> ClaimState:
     """
     Safely reconstruct ClaimState from DB row.
     Prevents None → Pydantic validation errors.
+
+    DB rows are already typed, so the state is built with model_construct
+    (no validation); document rows become DocumentRecord objects the same way.
     """
 
-    return ClaimState(
+    documents = [
+        DocumentRecord.model_construct(
+            filename=d.get("filename"),
+            content_type=d.get("content_type"),
+            size_bytes=d.get("size_bytes") or 0,
+            doc_type=d.get("doc_type"),
+            extracted_text=d.get("extracted_text"),
+        )
+        for d in docs or []
+    ]
+
+    return ClaimState.model_construct(
         transaction_id=claim.get("transaction_id"),
         claim_id=claim.get("claim_id"),
         customer_name=claim.get("customer_name"),
@@ -35,5 +50,40 @@ def build_state_from_db(claim: dict, docs: list) -> ClaimState:
         # DO NOT pass validation or assignment from DB
         # Let Pydantic create default objects
 
-        documents=docs or []
+        documents=documents
     )
+
+
+def state_get(state, key: str):
+    """
+    Read one field from a graph result, whether it came back as a dict or as
+    a ClaimState, without model_dump()-ing the whole state first.
+    """
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+def dump_validation(validation) -> str:
+    """
+    Serialize a ValidationResult (or its dumped dict) for the claims.validation
+    column as real JSON, so readers can json-parse it instead of literal_eval.
+    Models are serialized by pydantic-core directly (no intermediate dict);
+    dicts go through orjson.
+    """
+    if hasattr(validation, "model_dump_json"):
+        return validation.model_dump_json()
+    return json_dumps(validation)
+
+
+def load_validation(text):
+    """
+    Inverse of dump_validation: parse the claims.validation column back into
+    a dict. Returns None for empty or legacy (non-JSON) values.
+    """
+    if not text:
+        return None
+    try:
+        return json_loads(text)
+    except JSONDecodeError:
+        return None
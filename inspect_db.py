@@ -12,6 +12,8 @@ DB_PATH = os.path.join(BASE_DIR, "data", "claims.db")
 # Connect to DB
 # -----------------------------
 conn = sqlite3.connect(DB_PATH)
+conn.execute("PRAGMA journal_mode=WAL;")
+conn.execute("PRAGMA synchronous=NORMAL;")
 cursor = conn.cursor()
 
 # -----------------------------
@@ -38,6 +40,8 @@ new_columns = {
 
 existing_cols = get_columns("claims")
 
+# All ALTERs in one transaction (DDL would otherwise autocommit one by one)
+cursor.execute("BEGIN IMMEDIATE;")
 for col, col_type in new_columns.items():
     if col not in existing_cols:
         print(f"Adding column: {col}")
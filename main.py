@@ -1,9 +1,12 @@
 
+import asyncio
+import functools
+import inspect
 from fastapi import FastAPI
 from fastmcp import FastMCP
 from typing import Optional
-from datetime import datetime, timezone 
-from backend.utils.state_builder import build_state_from_db
+from backend.utils.clock import utcnow_iso as _utcnow_iso
+from backend.utils.state_builder import build_state_from_db, dump_validation, load_validation, state_get
 
 # ----------------------
 # Backend modules
@@ -12,16 +15,19 @@ from backend.state.claim_state import ClaimState
 from backend.db.sqlite_store import (
     init_db,
     fetch_claim_and_docs,
-    update_claim_fields
+    update_claim_fields,
+    async_fetch_claim_status,
+    async_update_claim_fields
 )
 
 from backend.agents.registration_agent import registration_agent
 from backend.agents.validation_agent import validation_agent
 from backend.agents.llm_validation_agent import llm_validation_agent
 from backend.agents.fraud_agent import fraud_agent
-from backend.agents.investigator_agent import investigator_agent
+from backend.agents.investigator_agent import investigator_agent, assignment_fields
 from backend.agents.manager_agent import ManagerAgent
 from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.mcp_tools.claim_processing import ALLOWED_DECISIONS
 
 # ----------------------
 # FastAPI app init
@@ -38,6 +44,43 @@ def startup():
 # ----------------------
 mcp = FastMCP.from_fastapi(app=app)
 
+# ----------------------
+# Shared helpers
+# ----------------------
+# ManagerAgent keeps no per-request state, so one instance serves every tool call
+MANAGER = ManagerAgent()
+
+# Final decisions that the graph/manager will never change on a re-run
+TERMINAL_DECISIONS = frozenset({"APPROVED", "REJECTED", "ESCALATED_TO_SIU"})
+
+
+def with_claim_state(fn):
+    """
+    Fetch the claim once, rebuild its ClaimState and call `fn(state, ...)`.
+    The registered tool still takes `transaction_id` as its first argument.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(transaction_id: str, **kwargs):
+        claim, docs = await asyncio.to_thread(fetch_claim_and_docs, transaction_id, True)
+        if not claim:
+            return {"error": "Claim not found"}
+
+        return await fn(build_state_from_db(claim, docs), **kwargs)
+
+    # Expose `transaction_id` (not `state`) in the MCP tool schema
+    params = list(inspect.signature(fn).parameters.values())[1:]
+    wrapper.__signature__ = inspect.Signature([
+        inspect.Parameter("transaction_id", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=str),
+        *params,
+    ])
+    wrapper.__annotations__ = {
+        "transaction_id": str,
+        **{k: v for k, v in fn.__annotations__.items() if k != "state"},
+    }
+    del wrapper.__wrapped__
+    return wrapper
+
 # ============================================================
 # 1️⃣ CLAIM REGISTRATION TOOL
 # ============================================================
@@ -60,13 +103,14 @@ async def ClaimRegistrationTool(
         extracted_text=description,
     )
 
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
-    update_claim_fields(
+    await asyncio.to_thread(
+        update_claim_fields,
         state.transaction_id,
         extracted_text=description,
         status="REGISTERED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
     return {
@@ -80,67 +124,60 @@ async def ClaimRegistrationTool(
 # ============================================================
 
 @mcp.tool
-async def ClaimValidationTool(transaction_id: str):
+@with_claim_state
+async def ClaimValidationTool(state: ClaimState):
 
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
+    state = await asyncio.to_thread(validation_agent, state)
+    dumped = state.model_dump()
 
-    state = build_state_from_db(claim, docs)
-    state = validation_agent(state)
-
-    update_claim_fields(
-        transaction_id,
-        validation=str(state.validation.model_dump()),
+    await asyncio.to_thread(
+        update_claim_fields,
+        state.transaction_id,
+        validation=dump_validation(dumped["validation"]),
         status="VALIDATED" if state.claim_validated else "FAILED_VALIDATION",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
-    return state.model_dump()
+    return dumped
 
 # ============================================================
 # 3️⃣ LLM VALIDATION TOOL
 # ============================================================
 
 @mcp.tool
-async def ClaimLLMValidationTool(transaction_id: str):
+@with_claim_state
+async def ClaimLLMValidationTool(state: ClaimState):
 
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
-
-    state = build_state_from_db(claim, docs)
-    state = llm_validation_agent(state)
+    state = await asyncio.to_thread(llm_validation_agent, state)
+    dumped = state.model_dump()
 
-    update_claim_fields(
-        transaction_id,
-        validation=str(state.validation.model_dump()),
+    await asyncio.to_thread(
+        update_claim_fields,
+        state.transaction_id,
+        validation=dump_validation(dumped["validation"]),
         status="AI_VALIDATED" if state.claim_validated else "PENDING_DOCUMENTS",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
-    return state.model_dump()
+    return dumped
 
 # ============================================================
 # 4️⃣ FRAUD CHECK TOOL
 # ============================================================
 
 @mcp.tool
-async def FraudCheckTool(transaction_id: str):
-
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
+@with_claim_state
+async def FraudCheckTool(state: ClaimState):
 
-    state = build_state_from_db(claim, docs)
-    state = fraud_agent(state)
+    state = await asyncio.to_thread(fraud_agent, state)
 
-    update_claim_fields(
-        transaction_id,
+    await asyncio.to_thread(
+        update_claim_fields,
+        state.transaction_id,
         fraud_score=state.fraud_score,
         fraud_decision=state.fraud_decision,
         status="FRAUD_CHECKED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
     return state.model_dump()
@@ -150,21 +187,19 @@ async def FraudCheckTool(transaction_id: str):
 # ============================================================
 
 @mcp.tool
-async def InvestigatorAssignmentTool(transaction_id: str):
-
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
+@with_claim_state
+async def InvestigatorAssignmentTool(state: ClaimState):
 
-    state = build_state_from_db(claim, docs)
-    state = investigator_agent(state)
+    state = await asyncio.to_thread(investigator_agent, state)
+    now = _utcnow_iso()
 
-    update_claim_fields(
-        transaction_id,
-        investigator_id=state.assignment.investigator_id,
+    await asyncio.to_thread(
+        update_claim_fields,
+        state.transaction_id,
+        **assignment_fields(state.assignment, now),
         status="UNDER_INVESTIGATION"
         if state.assignment.investigator_id else "NO_INVESTIGATION_REQUIRED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=now
     )
 
     return state.model_dump()
@@ -174,41 +209,51 @@ async def InvestigatorAssignmentTool(transaction_id: str):
 # ============================================================
 
 @mcp.tool
-async def ManagerProcessingTool(transaction_id: str):
-
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
-
-    state = build_state_from_db(claim, docs)
-
-    # Run graph workflow
-    final_state = await claim_graph_v3.ainvoke(state)
-    if not isinstance(final_state, dict):
-        final_state = final_state.model_dump()
-
-    # Run Manager Agent
-    manager = ManagerAgent()
-    manager_result = manager.run(state)
+@with_claim_state
+async def ManagerProcessingTool(state: ClaimState):
+
+    # Already decided → replay the stored outcome instead of re-running the graph
+    # (the row was just fetched by with_claim_state, so this is a cache hit)
+    if state.final_decision in TERMINAL_DECISIONS:
+        claim, _ = await asyncio.to_thread(fetch_claim_and_docs, state.transaction_id)
+        return {
+            "transaction_id": state.transaction_id,
+            "final_decision": state.final_decision,
+            "manager_decision": claim.get("manager_decision"),
+            "fraud_score": state.fraud_score,
+            "fraud_decision": state.fraud_decision,
+            "validation": load_validation(claim.get("validation"))
+        }
+
+    # Run graph workflow and Manager Agent concurrently; the manager only
+    # routes on the pre-graph state, so it gets its own copy
+    final_state, manager_result = await asyncio.gather(
+        claim_graph_v3.ainvoke(state),
+        asyncio.to_thread(MANAGER.run, state.model_copy(deep=True))
+    )
 
-    update_claim_fields(
-        transaction_id,
+    # Single write: investigator assignment + manager results
+    now = _utcnow_iso()
+    await asyncio.to_thread(
+        update_claim_fields,
+        state.transaction_id,
+        **assignment_fields(state_get(final_state, "assignment"), now),
         final_decision=manager_result.get("final_decision"),
         status=manager_result.get("final_decision") or "UNDER_REVIEW",
-        fraud_score=final_state.get("fraud_score"),
-        fraud_decision=final_state.get("fraud_decision"),
-        validation=str(final_state.get("validation")),
+        fraud_score=state_get(final_state, "fraud_score"),
+        fraud_decision=state_get(final_state, "fraud_decision"),
+        validation=dump_validation(state_get(final_state, "validation")),
         manager_decision=manager_result.get("manager_decision"),
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=now
     )
 
     return {
-        "transaction_id": transaction_id,
+        "transaction_id": state.transaction_id,
         "final_decision": manager_result.get("final_decision"),
         "manager_decision": manager_result.get("manager_decision"),
-        "fraud_score": final_state.get("fraud_score"),
-        "fraud_decision": final_state.get("fraud_decision"),
-        "validation": final_state.get("validation")
+        "fraud_score": state_get(final_state, "fraud_score"),
+        "fraud_decision": state_get(final_state, "fraud_decision"),
+        "validation": state_get(final_state, "validation")
     }
 
 # ============================================================
@@ -216,20 +261,18 @@ async def ManagerProcessingTool(transaction_id: str):
 # ============================================================
 
 @mcp.tool
-def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
+async def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
 
     decision = decision.upper()
-    valid = ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]
-
-    if decision not in valid:
+    if decision not in ALLOWED_DECISIONS:
         return {"error": "Invalid decision"}
 
-    update_claim_fields(
+    await async_update_claim_fields(
         transaction_id,
         final_decision=decision,
         status=decision,
         manager_comment=comment,
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=_utcnow_iso()
     )
 
     return {
@@ -242,9 +285,9 @@ def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[st
 # ============================================================
 
 @mcp.tool
-def ClaimStatusTool(transaction_id: str):
+async def ClaimStatusTool(transaction_id: str):
 
-    claim, _ = fetch_claim_and_docs(transaction_id)
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Transaction not found"}
 
@@ -1,5 +1,6 @@
 # mcp_server.py
 
+from fastapi import Response
 from fastmcp import FastMCP
 from server.app_v3 import app  # your existing FastAPI app
 from server.app_v3 import register_claim, check_status, process_claim, manager_decision
@@ -35,12 +36,12 @@ async def ClaimRegistrationTool(
     )
 
 @mcp.tool
-def ClaimStatusTool(transaction_id: str):
+async def ClaimStatusTool(transaction_id: str):
     """Check claim status"""
     from pydantic import BaseModel
     class Request(BaseModel):
         transaction_id: str
-    return check_status(Request(transaction_id=transaction_id))
+    return await check_status(Request(transaction_id=transaction_id), Response())
 
 @mcp.tool
 async def ManagerProcessingTool(transaction_id: str):
@@ -48,12 +49,12 @@ async def ManagerProcessingTool(transaction_id: str):
     return await process_claim(transaction_id)
 
 @mcp.tool
-def ManagerDecisionTool(transaction_id: str, decision: str):
+async def ManagerDecisionTool(transaction_id: str, decision: str):
     """Manager override decision"""
     from pydantic import BaseModel
     class Request(BaseModel):
         decision: str
-    return manager_decision(transaction_id, Request(decision=decision))
+    return await manager_decision(transaction_id, Request(decision=decision))
 
 # ----------------------
 # Run MCP server
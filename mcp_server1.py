@@ -1,9 +1,10 @@
 # server/app_v4_mcp.py
 
+import asyncio
+from bisect import bisect_right
 from fastapi import FastAPI
 from fastmcp import FastMCP
 from typing import List, Optional
-from datetime import datetime, timezone
 
 # ----------------------
 # Import backend modules
@@ -11,13 +12,19 @@ from datetime import datetime, timezone
 from backend.state.claim_state import ClaimState
 from backend.db.sqlite_store import (
     init_db,
-    fetch_claim_and_docs,
-    update_claim_fields,
-    insert_documents
+    persist_registration,
+    async_fetch_claim_and_docs,
+    async_fetch_claim_status,
+    async_update_claim_fields
 )
 from backend.db.investigator_store import init_investigator_db
 from backend.agents.registration_agent import registration_agent
-from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.agents.investigator_agent import assignment_fields
+from backend.mcp_tools.claim_processing import ALLOWED_DECISIONS, run_claim_graph, process_claims_batch
+from backend.services import llm_client
+from backend.utils import ocr
+from backend.utils.clock import utcnow_iso
+from backend.utils.state_builder import state_get
 
 # ----------------------
 # FastAPI app init
@@ -31,6 +38,14 @@ def startup():
     init_investigator_db() 
     print("[DB] investigator Initiazed")
 
+    # Warm-load OCR and LLM clients so the first request doesn't pay for it
+    for name, warm_up in (("OCR", ocr.warm_up), ("LLM", llm_client.warm_up)):
+        try:
+            warm_up()
+            print(f"[{name}] Warmed up")
+        except Exception as e:
+            print(f"[{name}] Warm-up skipped: {e}")
+
 # ----------------------
 # Convert FastAPI app into MCP
 # ----------------------
@@ -62,31 +77,34 @@ async def ClaimRegistrationTool(
     )
 
     # Run registration agent
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
-    combined_text = description or ""
+    # Pieces of the aggregated text, joined once after the loop
+    text_parts = [description or ""]
 
-    # Process MCP JSON documents
+    # Process MCP JSON documents (collected, then persisted in one transaction)
+    rows = []
     for doc in documents:
         state.documents.append(doc)
-        combined_text += f"\n\n[DOCUMENT: {doc['doc_type'].upper()}]\n{doc['extracted_text']}"
-
-        # Persist in DB
-        insert_documents(
-            transaction_id=state.transaction_id,
-            filename=doc["filename"],
-            content_type=doc.get("content_type"),
-            size_bytes=doc.get("size_bytes", 0),
-            doc_type=doc.get("doc_type"),
-            extracted_text=doc.get("extracted_text")
-        )
-
-    # Store aggregated extracted text
-    update_claim_fields(
+        text_parts.append(f"\n\n[DOCUMENT: {doc['doc_type'].upper()}]\n{doc['extracted_text']}")
+        rows.append({
+            "filename": doc["filename"],
+            "content_type": doc.get("content_type"),
+            "size_bytes": doc.get("size_bytes", 0),
+            "doc_type": doc.get("doc_type"),
+            "extracted_text": doc.get("extracted_text")
+        })
+
+    combined_text = "".join(text_parts)
+
+    # Persist the documents and the aggregated extracted text in one transaction
+    await asyncio.to_thread(
+        persist_registration,
         state.transaction_id,
+        rows,
         extracted_text=combined_text,
         status="REGISTERED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=utcnow_iso()
     )
 
     state.extracted_text = combined_text
@@ -103,8 +121,8 @@ async def ClaimRegistrationTool(
 # MCP Tool: Check Status
 # ----------------------
 @mcp.tool
-def ClaimStatusTool(transaction_id: str):
-    claim, docs = fetch_claim_and_docs(transaction_id)
+async def ClaimStatusTool(transaction_id: str):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Transaction not found"}
 
@@ -114,90 +132,92 @@ def ClaimStatusTool(transaction_id: str):
         "policy_number": claim["policy_number"],
         "status": claim["status"],
         "final_decision": claim.get("final_decision"),
-        "documents_uploaded": len(docs) if docs else 0
+        "documents_uploaded": claim["documents_uploaded"]
     }
 
 # ----------------------
 # MCP Tool: AI Processing
 # ----------------------
-@mcp.tool
-async def ManagerProcessingTool(transaction_id: str):
-    claim, docs = fetch_claim_and_docs(transaction_id)
-    if not claim:
-        return {"error": "Claim not found"}
+# fraud_score < 0.3 → LOW, < 0.7 → MEDIUM, otherwise HIGH
+_RISK_BOUNDS = (0.3, 0.7)
+_RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
 
-    state = ClaimState(
-        transaction_id=claim["transaction_id"],
-        claim_id=claim["claim_id"],
-        customer_name=claim["customer_name"],
-        policy_number=claim["policy_number"],
-        amount=claim["amount"],
-        claim_type=claim["claim_type"],
-        extracted_text=claim["extracted_text"],
-        claim_registered=True,
-        registered_at=claim["registered_at"]
-    )
+
+async def _process_claim(claim: dict):
+    """Run the AI workflow for one claim row; returns (response, fields to persist)."""
+    transaction_id = claim["transaction_id"]
 
     # Run AI workflow
-    final_state = await claim_graph_v3.ainvoke(state)
-    if not isinstance(final_state, dict):
-        final_state = final_state.model_dump()
+    final_state = await run_claim_graph(claim)
 
     # Determine risk level
-    fraud_score = final_state.get("fraud_score", 0)
-    if fraud_score < 0.3:
-        risk_level = "LOW"
-    elif fraud_score < 0.7:
-        risk_level = "MEDIUM"
-    else:
-        risk_level = "HIGH"
-
-    # Persist AI results
-    update_claim_fields(
-        transaction_id,
-        final_decision=final_state.get("final_decision"),
+    fraud_score = state_get(final_state, "fraud_score") or 0
+    risk_level = _RISK_LEVELS[bisect_right(_RISK_BOUNDS, fraud_score)]
+
+    # AI results (single write, including investigator assignment)
+    now = utcnow_iso()
+    fields = dict(
+        **assignment_fields(state_get(final_state, "assignment"), now),
+        final_decision=state_get(final_state, "final_decision"),
         fraud_score=fraud_score,
-        fraud_decision=final_state.get("fraud_decision"),
-        ai_explanation=final_state.get("ai_explanation"),
-        status=final_state.get("final_decision") or "UNDER_REVIEW",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        fraud_decision=state_get(final_state, "fraud_decision"),
+        status=state_get(final_state, "final_decision") or "UNDER_REVIEW",
+        updated_at=now
     )
 
-    return {
+    response = {
         "transaction_id": transaction_id,
-        "final_decision": final_state.get("final_decision"),
+        "final_decision": state_get(final_state, "final_decision"),
         "fraud_score": fraud_score,
-        "fraud_decision": final_state.get("fraud_decision"),
-        "validation": final_state.get("validation"),
-        "assignment": final_state.get("assignment"),
-        "ai_explanation": final_state.get("ai_explanation"),
+        "fraud_decision": state_get(final_state, "fraud_decision"),
+        "validation": state_get(final_state, "validation"),
+        "assignment": state_get(final_state, "assignment"),
+        "ai_explanation": state_get(final_state, "ai_explanation"),
         "risk_level": risk_level
     }
+    return response, fields
+
+
+@mcp.tool
+async def ManagerProcessingTool(transaction_id: str):
+    claim, _ = await async_fetch_claim_and_docs(transaction_id)
+    if not claim:
+        return {"error": "Claim not found"}
+
+    response, fields = await _process_claim(claim)
+    await async_update_claim_fields(transaction_id, **fields)
+    return response
+
+# ----------------------
+# MCP Tool: AI Processing (batch)
+# ----------------------
+@mcp.tool
+async def ManagerBatchProcessingTool(transaction_ids: List[str]):
+    return await process_claims_batch(transaction_ids, _process_claim)
 
 # ----------------------
 # MCP Tool: Manager Decision (Human Override)
 # ----------------------
 @mcp.tool
-def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+async def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Claim not found"}
 
     decision = decision.upper()
-    valid_decisions = ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]
-    if decision not in valid_decisions:
+    if decision not in ALLOWED_DECISIONS:
         return {"error": "Invalid decision"}
 
     # Append audit log
     audit_msg = f"Manager decision: {decision}"
     if comment:
         audit_msg += f" | Comment: {comment}"
-    update_claim_fields(
+    await async_update_claim_fields(
         transaction_id,
         final_decision=decision,
         status=decision,
         manager_comment=comment,
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=utcnow_iso()
     )
 
     return {
@@ -1,17 +1,25 @@
 # server/app_v4_mcp.py
 
+import asyncio
 from fastapi import FastAPI
 from fastmcp import FastMCP
-from typing import Optional
-from datetime import datetime, timezone
+from typing import List, Optional
 
 # ----------------------
 # Backend modules
 # ----------------------
 from backend.state.claim_state import ClaimState
-from backend.db.sqlite_store import init_db, fetch_claim_and_docs, update_claim_fields
+from backend.db.sqlite_store import (
+    init_db,
+    async_fetch_claim_and_docs,
+    async_fetch_claim_status,
+    async_update_claim_fields
+)
 from backend.agents.registration_agent import registration_agent
-from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.agents.investigator_agent import assignment_fields
+from backend.mcp_tools.claim_processing import ALLOWED_DECISIONS, run_claim_graph, process_claims_batch
+from backend.utils.clock import utcnow_iso
+from backend.utils.state_builder import state_get
 
 # ----------------------
 # FastAPI app init
@@ -51,14 +59,14 @@ async def ClaimRegistrationTool(
     )
 
     # Run registration agent
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
     # Persist claim
-    update_claim_fields(
+    await async_update_claim_fields(
         state.transaction_id,
         extracted_text=description,
         status="REGISTERED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=utcnow_iso()
     )
 
     return {
@@ -72,8 +80,8 @@ async def ClaimRegistrationTool(
 # MCP Tool: Check Status
 # ----------------------
 @mcp.tool
-def ClaimStatusTool(transaction_id: str):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+async def ClaimStatusTool(transaction_id: str):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Transaction not found"}
 
@@ -88,61 +96,63 @@ def ClaimStatusTool(transaction_id: str):
 # ----------------------
 # MCP Tool: AI Processing
 # ----------------------
+async def _process_claim(claim: dict):
+    """Run the AI workflow for one claim row; returns (response, fields to persist)."""
+    transaction_id = claim["transaction_id"]
+    final_state = await run_claim_graph(claim)
+
+    # AI processing results (single write, including investigator assignment)
+    now = utcnow_iso()
+    fields = dict(
+        **assignment_fields(state_get(final_state, "assignment"), now),
+        final_decision=state_get(final_state, "final_decision"),
+        status=state_get(final_state, "final_decision") or "UNDER_REVIEW",
+        updated_at=now
+    )
+
+    response = {
+        "transaction_id": transaction_id,
+        "final_decision": state_get(final_state, "final_decision")
+    }
+    return response, fields
+
+
 @mcp.tool
 async def ManagerProcessingTool(transaction_id: str):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+    claim, _ = await async_fetch_claim_and_docs(transaction_id)
     if not claim:
         return {"error": "Claim not found"}
 
-    state = ClaimState(
-        transaction_id=claim["transaction_id"],
-        claim_id=claim["claim_id"],
-        customer_name=claim["customer_name"],
-        policy_number=claim["policy_number"],
-        amount=claim["amount"],
-        claim_type=claim["claim_type"],
-        extracted_text=claim["extracted_text"],
-        claim_registered=True,
-        registered_at=claim["registered_at"]
-    )
-
-    final_state = await claim_graph_v3.ainvoke(state)
-    if not isinstance(final_state, dict):
-        final_state = final_state.model_dump()
+    response, fields = await _process_claim(claim)
+    await async_update_claim_fields(transaction_id, **fields)
+    return response
 
-    # Persist AI processing results
-    update_claim_fields(
-        transaction_id,
-        final_decision=final_state.get("final_decision"),
-        status=final_state.get("final_decision") or "UNDER_REVIEW",
-        updated_at=datetime.now(timezone.utc).isoformat()
-    )
-
-    return {
-        "transaction_id": transaction_id,
-        "final_decision": final_state.get("final_decision")
-    }
+# ----------------------
+# MCP Tool: AI Processing (batch)
+# ----------------------
+@mcp.tool
+async def ManagerBatchProcessingTool(transaction_ids: List[str]):
+    return await process_claims_batch(transaction_ids, _process_claim)
 
 # ----------------------
 # MCP Tool: Manager Decision
 # ----------------------
 @mcp.tool
-def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
-    claim, _ = fetch_claim_and_docs(transaction_id)
+async def ManagerDecisionTool(transaction_id: str, decision: str, comment: Optional[str] = None):
+    claim = await async_fetch_claim_status(transaction_id)
     if not claim:
         return {"error": "Claim not found"}
 
     decision = decision.upper()
-    valid_decisions = ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]
-    if decision not in valid_decisions:
+    if decision not in ALLOWED_DECISIONS:
         return {"error": "Invalid decision"}
 
-    update_claim_fields(
+    await async_update_claim_fields(
         transaction_id,
         final_decision=decision,
         status=decision,
         manager_comment=comment,
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=utcnow_iso()
     )
 
     return {
@@ -5,6 +5,8 @@ import sqlite3
 DB_PATH = r"C:\Users\SAMARTH\Desktop\End2EndInsuranceClaim\data\claims.db"
 
 conn = sqlite3.connect(DB_PATH)
+conn.execute("PRAGMA journal_mode=WAL;")
+conn.execute("PRAGMA synchronous=NORMAL;")
 cursor = conn.cursor()
 
 # Column to add
@@ -1,15 +1,27 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from uuid import uuid4
 from typing import Dict
 
-app = FastAPI(title="Enterprise Insurance Claim System")
+app = FastAPI(title="Enterprise Insurance Claim System", default_response_class=ORJSONResponse)
 
 # -----------------------------
 # In-memory database
 # -----------------------------
-claims_db: Dict[str, dict] = {}
+@dataclass(slots=True)
+class ClaimRecord:
+    claim_id: str
+    policy_number: str
+    description: str
+    amount: float
+    status: str
+    registered_at: str
+
+
+claims_db: Dict[str, ClaimRecord] = {}
 
 
 # -----------------------------
@@ -29,6 +41,20 @@ class ClaimStatusRequest(BaseModel):
 # -----------------------------
 # Helper Function
 # -----------------------------
+# Confirmation text, formatted once per registration with a single strftime
+_CONF_TMPL = (
+    "Thank you for registering your claim.\n\n"
+    "Your claim '{cid}' under policy '{pol}' "
+    "was successfully registered on {d} at {t}.\n\n"
+    "Your reference number for this transaction is:\n"
+    "{tx}\n\n"
+    "Our team will now validate and review your claim. "
+    "You can use this reference number to track the status anytime.\n\n"
+    "Thank you for choosing our insurance services."
+)
+_CONF_DT_FMT = "%B %d, %Y|%I:%M %p UTC"
+
+
 def generate_confirmation_message(
     claim_id: str,
     policy_number: str,
@@ -36,19 +62,8 @@ def generate_confirmation_message(
     registered_at: datetime
 ) -> str:
 
-    formatted_date = registered_at.strftime("%B %d, %Y")
-    formatted_time = registered_at.strftime("%I:%M %p UTC")
-
-    return (
-        f"Thank you for registering your claim.\n\n"
-        f"Your claim '{claim_id}' under policy '{policy_number}' "
-        f"was successfully registered on {formatted_date} at {formatted_time}.\n\n"
-        f"Your reference number for this transaction is:\n"
-        f"{transaction_id}\n\n"
-        f"Our team will now validate and review your claim. "
-        f"You can use this reference number to track the status anytime.\n\n"
-        f"Thank you for choosing our insurance services."
-    )
+    d, t = registered_at.strftime(_CONF_DT_FMT).split("|", 1)
+    return _CONF_TMPL.format(cid=claim_id, pol=policy_number, d=d, t=t, tx=transaction_id)
 
 
 # -----------------------------
@@ -59,16 +74,17 @@ def register_claim(request: ClaimRegistrationRequest):
 
     transaction_id = str(uuid4())
     registered_at = datetime.now(timezone.utc)
+    registered_at_iso = registered_at.isoformat()
 
     # Store claim
-    claims_db[transaction_id] = {
-        "claim_id": request.claim_id,
-        "policy_number": request.policy_number,
-        "description": request.description,
-        "amount": request.amount,
-        "status": "Registered",
-        "registered_at": registered_at.isoformat()
-    }
+    claims_db[transaction_id] = ClaimRecord(
+        claim_id=request.claim_id,
+        policy_number=request.policy_number,
+        description=request.description,
+        amount=request.amount,
+        status="Registered",
+        registered_at=registered_at_iso
+    )
 
     message = generate_confirmation_message(
         request.claim_id,
@@ -79,7 +95,7 @@ def register_claim(request: ClaimRegistrationRequest):
 
     return {
         "transaction_id": transaction_id,
-        "registered_at": registered_at.isoformat(),
+        "registered_at": registered_at_iso,
         "message": message,
         "claim_id": request.claim_id,
         "policy_number": request.policy_number
@@ -90,7 +106,7 @@ def register_claim(request: ClaimRegistrationRequest):
 # Check Claim Status
 # -----------------------------
 @app.post("/claims/status")
-def check_status(request: ClaimStatusRequest):
+async def check_status(request: ClaimStatusRequest):
 
     claim = claims_db.get(request.transaction_id)
 
@@ -102,10 +118,10 @@ def check_status(request: ClaimStatusRequest):
 
     return {
         "transaction_id": request.transaction_id,
-        "claim_id": claim["claim_id"],
-        "policy_number": claim["policy_number"],
-        "status": claim["status"],
-        "registered_at": claim["registered_at"]
+        "claim_id": claim.claim_id,
+        "policy_number": claim.policy_number,
+        "status": claim.status,
+        "registered_at": claim.registered_at
     }
 
 
@@ -113,14 +129,14 @@ def check_status(request: ClaimStatusRequest):
 # Manager Decision Endpoint
 # -----------------------------
 @app.post("/claims/manager/approve/{transaction_id}")
-def approve_claim(transaction_id: str):
+async def approve_claim(transaction_id: str):
 
     claim = claims_db.get(transaction_id)
 
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
-    claim["status"] = "Approved"
+    claim.status = "Approved"
 
     return {
         "transaction_id": transaction_id,
@@ -130,14 +146,14 @@ def approve_claim(transaction_id: str):
 
 
 @app.post("/claims/manager/reject/{transaction_id}")
-def reject_claim(transaction_id: str):
+async def reject_claim(transaction_id: str):
 
     claim = claims_db.get(transaction_id)
 
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
-    claim["status"] = "Rejected"
+    claim.status = "Rejected"
 
     return {
         "transaction_id": transaction_id,
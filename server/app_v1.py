@@ -1,24 +1,36 @@
 # server/app.py
+import asyncio
+import hashlib
 import os
-import json
-import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timezone
 
 from fastapi import FastAPI, UploadFile, File, Form, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import ORJSONResponse, HTMLResponse, RedirectResponse
 from pydantic import BaseModel
 
 # ---- Project imports ----
 from backend.state.claim_state import ClaimState, DocumentRecord
-from backend.utils.ocr import ocr_any
+from backend.utils.ocr import ocr_any_path, new_content_hash, OCR_MAX_WORKERS, warm_up as ocr_warm_up
+from backend.utils.clock import utcnow_iso
 from backend.graph.claim_graph_v3 import claim_graph_v3
+from backend.agents.registration_agent import registration_agent
 from backend.agents.manager_agent import ManagerAgent
 from backend.agents.llm_validation_agent import llm_validation_agent
 from backend.agents.fraud_agent import fraud_agent
-from backend.agents.investigator_agent import investigator_agent
-from backend.db.sqlite_store import init_db, DB_PATH, fetch_claim_and_docs, update_claim_fields
+from backend.agents.investigator_agent import investigator_agent, assignment_fields
+from backend.db.sqlite_store import (
+    init_db,
+    DB_PATH,
+    db_conn,
+    rows_as_dicts,
+    fetch_claim_and_docs,
+    async_update_claim_fields,
+    async_update_decision
+)
 
 # Optional LLM client for registration confirmation
 try:
@@ -30,7 +42,7 @@ except Exception:
 # -----------------------------
 # FastAPI app & CORS
 # -----------------------------
-app = FastAPI(title="Insurance Claims API", version="1.0.0")
+app = FastAPI(title="Insurance Claims API", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +61,12 @@ def _startup():
     init_db()
     print(f"[Startup] DB at: {DB_PATH}")
 
+    # Load the Tesseract engine now so the first upload doesn't pay for it
+    try:
+        ocr_warm_up()
+    except Exception as e:
+        print(f"[OCR] Warm-up skipped: {e}")
+
 
 # -----------------------------
 # Utilities
@@ -63,21 +81,32 @@ def _safe_dump(obj) -> Dict[str, Any]:
         except Exception:
             return obj
 
-def _db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+def _db():
+    """Pooled connection (see backend/db/pool.py); use as `with _db() as conn`."""
+    return db_conn()
 
-def _llm_registration_message(state: ClaimState) -> str:
+# The LLM confirmation is nice-to-have: bound concurrent calls and fall back
+# to the deterministic message if the provider is slow
+_LLM_SEM = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+REGISTRATION_MSG_TIMEOUT_S = float(os.getenv("REGISTRATION_MSG_TIMEOUT_S", "2.0"))
+
+
+async def _llm_registration_message(info: Dict[str, Any]) -> str:
     """
     Generate a friendly registration confirmation using LLM (if available),
     with a safe deterministic fallback.
+    `info` only needs policy_number, claim_id, transaction_id and registered_at.
     """
+    policy_number = info.get("policy_number")
+    claim_id = info.get("claim_id")
+    transaction_id = info.get("transaction_id")
+    registered_at = info.get("registered_at")
+
     base = (
-        f"Registration successful for policy {state.policy_number or '(unknown)'}.\n"
-        f"Claim ID: {state.claim_id}\n"
-        f"Reference (Transaction ID): {state.transaction_id}\n"
-        f"Registered At: {state.registered_at}\n"
+        f"Registration successful for policy {policy_number or '(unknown)'}.\n"
+        f"Claim ID: {claim_id}\n"
+        f"Reference (Transaction ID): {transaction_id}\n"
+        f"Registered At: {registered_at}\n"
         "Thank you. We will contact you if any additional documents are required."
     )
 
@@ -103,12 +132,15 @@ Tone: concise, professional, reassuring.
 Plain text only (no markdown).
 
 Data:
-- Policy Number: {state.policy_number}
-- Claim ID: {state.claim_id}
-- Transaction ID: {state.transaction_id}
-- Registered At: {state.registered_at}
+- Policy Number: {policy_number}
+- Claim ID: {claim_id}
+- Transaction ID: {transaction_id}
+- Registered At: {registered_at}
 """
-        text = llm_response(prompt)
+        async with _LLM_SEM:
+            text = await asyncio.wait_for(
+                asyncio.to_thread(llm_response, prompt), timeout=REGISTRATION_MSG_TIMEOUT_S
+            )
         # Quota / content guard
         if not text or "RESOURCE_EXHAUSTED" in str(text) or "quota" in str(text).lower():
             return base
@@ -121,15 +153,15 @@ def _build_state_from_db(transaction_id: str) -> Optional[ClaimState]:
     """
     Reconstruct ClaimState from DB (claim + documents) so manager can process without re-upload.
     """
-    claim, docs = fetch_claim_and_docs(transaction_id)
+    claim, docs = fetch_claim_and_docs(transaction_id, include_text=True)
     if not claim:
         return None
 
-    # Convert docs
+    # Convert docs (DB rows are already typed, so skip validation)
     doc_models: List[DocumentRecord] = []
     for d in docs:
         doc_models.append(
-            DocumentRecord(
+            DocumentRecord.model_construct(
                 filename=d.get("filename") or "unnamed",
                 content_type=d.get("content_type") or "application/octet-stream",
                 size_bytes=int(d.get("size_bytes") or 0),
@@ -138,7 +170,7 @@ def _build_state_from_db(transaction_id: str) -> Optional[ClaimState]:
             )
         )
 
-    st = ClaimState(
+    st = ClaimState.model_construct(
         transaction_id=claim.get("transaction_id"),
         claim_id=claim.get("claim_id"),
         customer_name=claim.get("customer_name"),
@@ -154,24 +186,31 @@ def _build_state_from_db(transaction_id: str) -> Optional[ClaimState]:
     return st
 
 
+# Fraud scoring runs here while validation runs on the caller's thread
+_summary_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary")
+
+
 def _summarize_for_manager(state: ClaimState) -> Dict[str, Any]:
     """
-    Run validation → fraud → investigator → manager on DB-backed state, and return a manager-friendly summary.
-    This does NOT persist results to DB automatically.
+    Run validation ∥ fraud → investigator → manager on DB-backed state, and return a manager-friendly summary.
+    This has no DB side effects: the investigator is only previewed (no load
+    increment) and the manager decides without writing, so results can be cached.
     """
-    # 1) Validation (LLM + fallback)
+    # 1) + 2) Validation and fraud (LLM + fallback) only read the claim inputs,
+    # so fraud scores a copy concurrently and its fields are merged back.
+    # If you prefer to skip fraud until docs_ok, run it after validation instead.
+    fraud_future = _summary_pool.submit(fraud_agent, state.model_copy(deep=True))
     state = llm_validation_agent(state)
+    scored = fraud_future.result()
+    state.fraud_checked = scored.fraud_checked
+    state.fraud_score = scored.fraud_score
+    state.fraud_decision = scored.fraud_decision
 
-    # 2) Fraud (LLM + fallback).
-    # If you prefer to skip fraud until docs_ok, add: if state.validation.docs_ok: ...
-    state = fraud_agent(state)
-
-    # 3) Investigator assignment (based on fraud/amount)
-    state = investigator_agent(state)
+    # 3) Suggested investigator (based on fraud/amount)
+    state = investigator_agent(state, dry_run=True)
 
     # 4) Manager computes suggested decision
-    mgr = ManagerAgent()
-    state = mgr.run(state)
+    ManagerAgent().run(state, persist=False)
 
     summary = {
         "transaction_id": state.transaction_id,
@@ -216,6 +255,61 @@ def healthz():
     return {"status": "ok", "db": DB_PATH}
 
 
+# Uploads are spooled to temp files in 1 MiB chunks (hashed on the way for the
+# OCR cache) instead of being read into memory, then OCR'd concurrently in
+# worker threads; the semaphore bounds how many run at once so a large batch
+# doesn't oversubscribe the CPU.
+_ocr_sem = asyncio.Semaphore(OCR_MAX_WORKERS)
+_SPOOL_CHUNK = 1 << 20
+
+
+def _spool_upload(f: UploadFile):
+    """Copy an upload to a temp file; returns (path, size, content hash)."""
+    h = new_content_hash()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(f.filename or "")[1]) as tmp:
+        for chunk in iter(lambda: f.file.read(_SPOOL_CHUNK), b""):
+            h.update(chunk)
+            tmp.write(chunk)
+            size += len(chunk)
+    return tmp.name, size, h.hexdigest()
+
+
+async def _ocr_one(f: UploadFile):
+    """Returns (size_bytes, text); OCR failures yield empty text."""
+    path = None
+    try:
+        path, size, digest = await asyncio.to_thread(_spool_upload, f)
+        try:
+            async with _ocr_sem:
+                text = await asyncio.to_thread(
+                    ocr_any_path, path, filename=f.filename,
+                    content_type=f.content_type or "", digest=digest
+                )
+        except Exception:
+            text = ""
+        return size, text
+    except Exception:
+        return 0, ""
+    finally:
+        if path:
+            os.unlink(path)
+
+
+async def _ocr_uploads(files: List[UploadFile]) -> List[DocumentRecord]:
+    results = await asyncio.gather(*(_ocr_one(f) for f in files))
+    return [
+        DocumentRecord(
+            filename=f.filename or "unnamed",
+            content_type=f.content_type or "application/octet-stream",
+            size_bytes=size,
+            doc_type=None,  # let validation classify later
+            extracted_text=text,
+        )
+        for f, (size, text) in zip(files, results)
+    ]
+
+
 # 1) Register claim (form + files) → OCR → registration agent → confirmation (LLM text or fallback)
 @app.post("/claims/register")
 async def register_claim(
@@ -234,22 +328,7 @@ async def register_claim(
     - Returns a friendly confirmation message containing transaction_id and registered_at.
     """
     # OCR doc uploads
-    docs: List[DocumentRecord] = []
-    for f in files:
-        content = await f.read()
-        try:
-            text = ocr_any(content, filename=f.filename, content_type=f.content_type or "")
-        except Exception:
-            text = ""
-        docs.append(
-            DocumentRecord(
-                filename=f.filename or "unnamed",
-                content_type=f.content_type or "application/octet-stream",
-                size_bytes=len(content or b""),
-                doc_type=None,  # let validation classify later
-                extracted_text=text,
-            )
-        )
+    docs = await _ocr_uploads(files)
 
     # Build initial state with user description; registration will aggregate OCR into extracted_text
     st = ClaimState(
@@ -263,11 +342,15 @@ async def register_claim(
     )
 
     # Run registration node logic (outside of graph) to avoid full flow here
-    from backend.agents.registration_agent import registration_agent
-    st = registration_agent(st)
+    st = await asyncio.to_thread(registration_agent, st)
 
     # Confirmation message
-    confirmation = _llm_registration_message(st)
+    confirmation = await _llm_registration_message({
+        "policy_number": st.policy_number,
+        "claim_id": st.claim_id,
+        "transaction_id": st.transaction_id,
+        "registered_at": st.registered_at,
+    })
 
     return {
         "transaction_id": st.transaction_id,
@@ -279,6 +362,67 @@ async def register_claim(
 
 
 # 2) Full E2E processing (Register → Validate → Fraud → Investigator → Manager)
+# Identical submissions already in flight (retries, double-clicks) share one
+# graph run: the run is its own task and every caller (the first included)
+# awaits it through shield, so a disconnecting caller never cancels it for
+# the others. Entries are removed as soon as the run finishes.
+_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+
+def _submission_done(key: str, task: asyncio.Task):
+    _INFLIGHT.pop(key, None)
+    if not task.cancelled():
+        task.exception()  # mark retrieved in case every caller went away
+
+
+def _submission_key(st: ClaimState) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    for v in (st.claim_id, st.customer_name, st.policy_number, st.amount, st.claim_type, st.extracted_text):
+        h.update(str(v).encode())
+        h.update(b"\x1f")
+    for d in st.documents:
+        h.update(f"{d.filename}\x1e{d.extracted_text}".encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+async def _run_submission(st: ClaimState) -> Dict[str, Any]:
+    timeline: List[Dict[str, Any]] = []
+    final_obj: Any = None
+
+    # Single graph run: "updates" chunks give the timeline (one per finished
+    # node), "values" chunks carry the full state, the last one being final
+    async for mode, chunk in claim_graph_v3.astream(st, stream_mode=["updates", "values"]):
+        if mode == "updates":
+            for name in chunk:
+                timeline.append({"type": "node_end", "node": name})
+        else:
+            final_obj = chunk
+
+    final_state = _safe_dump(final_obj)
+
+    # The graph's investigator node only claims the investigator; record the
+    # assignment on the claim so their load is accounted for
+    fields = assignment_fields(final_state.get("assignment"), utcnow_iso())
+    if fields:
+        await async_update_claim_fields(final_state.get("transaction_id"), **fields)
+
+    # Build confirmation AFTER the graph (now we have transaction_id & registered_at set by registration node)
+    # (the helper reads four plain fields, so no ClaimState is rebuilt here)
+    try:
+        confirmation = await _llm_registration_message(final_state)
+    except Exception:
+        confirmation = "Registration complete."
+
+    return {
+        "transaction_id": final_state.get("transaction_id"),
+        "registered_at": final_state.get("registered_at"),
+        "confirmation_message": confirmation,
+        "timeline": timeline,
+        "final_state": final_state,
+    }
+
+
 @app.post("/claims/submit")
 async def submit_claim_full(
     claim_id: str = Form(...),
@@ -290,28 +434,13 @@ async def submit_claim_full(
     files: List[UploadFile] = File(default=[]),
 ):
     """
-    Runs the full v3 graph with event streaming to capture timeline:
+    Runs the full v3 graph once, streaming node updates to capture a timeline:
     Register → Validate (LLM) → Fraud (LLM+fallback) → Investigator → Manager.
     - Do NOT call registration_agent separately here (graph starts at register).
     - Confirmation message is generated AFTER the graph using the final state (which includes transaction_id).
     """
     # OCR uploads; DO NOT concatenate here to avoid duplication — registration will aggregate
-    docs: List[DocumentRecord] = []
-    for f in files:
-        content = await f.read()
-        try:
-            text = ocr_any(content, filename=f.filename, content_type=f.content_type or "")
-        except Exception:
-            text = ""
-        docs.append(
-            DocumentRecord(
-                filename=f.filename or "unnamed",
-                content_type=f.content_type or "application/octet-stream",
-                size_bytes=len(content or b""),
-                doc_type=None,
-                extracted_text=text,
-            )
-        )
+    docs = await _ocr_uploads(files)
 
     st = ClaimState(
         claim_id=claim_id,
@@ -323,108 +452,100 @@ async def submit_claim_full(
         documents=docs,
     )
 
-    timeline: List[Dict[str, Any]] = []
-    final_obj: Any = None
-
-    # Stream events to build a timeline
-    try:
-        async for event in claim_graph_v3.astream_events(st, version="v1"):
-            ev = event.get("event") or event.get("type")
-            name = event.get("name") or (event.get("data") or {}).get("name")
-            if ev in ("on_node_start", "node_start"):
-                timeline.append({"type": "node_start", "node": name})
-            elif ev in ("on_node_end", "node_end"):
-                timeline.append({"type": "node_end", "node": name})
-
-            # Try to capture the final state from the stream
-            if ev in ("on_graph_end", "on_chain_end", "end"):
-                output = event.get("output") or (event.get("data") or {}).get("output")
-                if output is not None:
-                    final_obj = output
-    except Exception:
-        # If streaming isn't supported, fallback to ainvoke
-        pass
-
-    if final_obj is None:
-        final_obj = await claim_graph_v3.ainvoke(st)
-
-    final_state = _safe_dump(final_obj)
-
-    # Build confirmation AFTER the graph (now we have transaction_id & registered_at set by registration node)
-    try:
-        # Rebuild Pydantic object if needed for the helper
-        s = final_obj if isinstance(final_obj, ClaimState) else None
-        if s is None:
-            # Make a shallow compatible ClaimState for message
-            s = ClaimState(**final_state)
-        confirmation = _llm_registration_message(s)
-    except Exception:
-        confirmation = "Registration complete."
-
-    return {
-        "transaction_id": final_state.get("transaction_id"),
-        "registered_at": final_state.get("registered_at"),
-        "confirmation_message": confirmation,
-        "timeline": timeline,
-        "final_state": final_state,
-    }
+    # No await between the lookup and the insert, so no lock is needed
+    key = _submission_key(st)
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_run_submission(st))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda t: _submission_done(key, t))
+    return await asyncio.shield(task)
 
 
 # 3) Manager: list recent claims (SQLite)
-@app.get("/manager/claims")
-async def manager_list_claims(limit: int = 50):
+def _list_claims(limit: int) -> List[Dict[str, Any]]:
     with _db() as conn:
-        rows = conn.execute("""
+        return rows_as_dicts(conn.execute("""
             SELECT transaction_id, claim_id, customer_name, policy_number,
                    amount, claim_type, registered_at, status, final_decision
             FROM claims
             ORDER BY datetime(registered_at) DESC
             LIMIT ?
-        """, (limit,)).fetchall()
-        return {"claims": [dict(r) for r in rows]}
+        """, (limit,)))
+
+
+@app.get("/manager/claims")
+async def manager_list_claims(limit: int = 50):
+    return {"claims": await asyncio.to_thread(_list_claims, limit)}
 
 
 # 4) Manager: claim + documents (toggle OCR text with include_text)
-@app.get("/manager/claims/{transaction_id}")
-async def manager_get_claim(transaction_id: str, include_text: bool = False, text_limit: int = 1500):
+# Manager reads are cached on the claim's (updated_at, registered_at): any
+# write that bumps updated_at (e.g. a manager decision) makes the next read miss.
+def _claim_version(transaction_id: str) -> Optional[tuple]:
     with _db() as conn:
-        c = conn.execute("SELECT * FROM claims WHERE transaction_id=?", (transaction_id,)).fetchone()
-        if not c:
-            return JSONResponse(status_code=404, content={"error": "not found", "transaction_id": transaction_id})
-
-        cols = "id, filename, content_type, size_bytes, doc_type"
-        if include_text:
-            cols += ", extracted_text"
-        rows = conn.execute(
-            f"SELECT {cols} FROM claim_documents WHERE transaction_id=? ORDER BY id ASC",
+        row = conn.execute(
+            "SELECT updated_at, registered_at FROM claims WHERE transaction_id=?",
             (transaction_id,)
-        ).fetchall()
+        ).fetchone()
+    return tuple(row) if row else None
+
 
-        docs = []
-        for r in rows:
-            d = dict(r)
-            if include_text and d.get("extracted_text"):
-                t = d["extracted_text"]
-                if len(t) > text_limit:
-                    d["extracted_text"] = t[:text_limit] + "…"
-            docs.append(d)
+@lru_cache(maxsize=512)
+def _claim_detail(transaction_id: str, include_text: bool, text_limit: int, version: tuple):
+    claim, rows = fetch_claim_and_docs(transaction_id, include_text=include_text)
+    if not claim:
+        return None
 
-        return {"claim": dict(c), "documents": docs}
+    docs = []
+    for d in rows:
+        if include_text and d.get("extracted_text"):
+            t = d["extracted_text"]
+            if len(t) > text_limit:
+                d["extracted_text"] = t[:text_limit] + "…"
+        docs.append(d)
+
+    return {"claim": claim, "documents": docs}
+
+
+@app.get("/manager/claims/{transaction_id}")
+async def manager_get_claim(transaction_id: str, include_text: bool = False, text_limit: int = 1500):
+    version = await asyncio.to_thread(_claim_version, transaction_id)
+    detail = None
+    if version is not None:
+        detail = await asyncio.to_thread(_claim_detail, transaction_id, include_text, text_limit, version)
+    if detail is None:
+        return ORJSONResponse(status_code=404, content={"error": "not found", "transaction_id": transaction_id})
+    return detail
 
 
 # 5) Manager: computed summary (validation, missing docs, fraud results, investigator, suggested decision)
-@app.get("/manager/claims/{transaction_id}/summary")
-async def manager_claim_summary(transaction_id: str):
+@lru_cache(maxsize=512)
+def _claim_summary(transaction_id: str, version: tuple) -> Optional[Dict[str, Any]]:
     st = _build_state_from_db(transaction_id)
     if not st:
-        return JSONResponse(status_code=404, content={"error": "not found", "transaction_id": transaction_id})
+        return None
 
     # If you want demos to never use LLM, set env LLM_DISABLE=true (agents have fallbacks)
-    summary = _summarize_for_manager(st)
+    return _summarize_for_manager(st)
+
+
+@app.get("/manager/claims/{transaction_id}/summary")
+async def manager_claim_summary(transaction_id: str):
+    version = await asyncio.to_thread(_claim_version, transaction_id)
+    summary = None
+    if version is not None:
+        summary = await asyncio.to_thread(_claim_summary, transaction_id, version)
+    if summary is None:
+        return ORJSONResponse(status_code=404, content={"error": "not found", "transaction_id": transaction_id})
     return summary
 
 
 # 6) Manager: record human decision into DB
+_ALLOWED_DECISIONS: frozenset[str] = frozenset({
+    "APPROVED", "REJECTED", "PENDING_DOCUMENTS", "ESCALATED_TO_SIU", "MANUAL_REVIEW"
+})
+
 class ManagerDecisionPayload(BaseModel):
     decision: str                    # "APPROVED" | "REJECTED" | "PENDING_DOCUMENTS" | "ESCALATED_TO_SIU" | "MANUAL_REVIEW"
     comment: Optional[str] = None    # Optional note (store if you add a column for it)
@@ -432,24 +553,19 @@ class ManagerDecisionPayload(BaseModel):
 @app.patch("/manager/claims/{transaction_id}/decision")
 async def manager_set_decision(transaction_id: str, payload: ManagerDecisionPayload):
     decision = payload.decision.strip().upper()
-    if decision not in {"APPROVED", "REJECTED", "PENDING_DOCUMENTS", "ESCALATED_TO_SIU", "MANUAL_REVIEW"}:
-        return JSONResponse(status_code=400, content={"error": "invalid decision"})
-
-    now = datetime.now(timezone.utc).isoformat()
+    if decision not in _ALLOWED_DECISIONS:
+        return ORJSONResponse(status_code=400, content={"error": "invalid decision"})
 
     # NOTE: Ensure your `claims` table has these columns:
     #   ALTER TABLE claims ADD COLUMN final_decision TEXT;
     #   ALTER TABLE claims ADD COLUMN updated_at TEXT;
-    fields = {
-        "final_decision": decision,
-        "status": decision,
-        "updated_at": now,
-        # "manager_comment": payload.comment,  # if you add this column
-    }
-
+    # (payload.comment is not stored; add a manager_comment column to keep it)
     try:
-        update_claim_fields(transaction_id, **fields)
+        row = await async_update_decision(transaction_id, decision, utcnow_iso())
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": f"DB error: {type(e).__name__}: {e}"})
+        return ORJSONResponse(status_code=500, content={"error": f"DB error: {type(e).__name__}: {e}"})
+
+    if row is None:
+        return ORJSONResponse(status_code=404, content={"error": "claim not found"})
 
-    return {"transaction_id": transaction_id, "final_decision": decision, "updated_at": now}
\ No newline at end of file
+    return row
\ No newline at end of file
@@ -1,8 +1,11 @@
 # server/app.py
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Optional
 
 # Graph
@@ -10,19 +13,27 @@ from backend.graph.claim_graph_v3 import claim_graph_v3
 
 # State
 from backend.state.claim_state import ClaimState
+from backend.utils.clock import utcnow_iso
+from backend.utils.state_builder import state_get
+
+# Agents
+from backend.agents.registration_agent import registration_agent
+from backend.agents.investigator_agent import assignment_fields
 
 # DB
 from backend.db.sqlite_store import (
     init_db,
-    fetch_claim_and_docs,
-    update_claim_fields,
+    async_fetch_claim_and_docs,
+    async_update_claim_fields,
+    async_update_decision,
+    async_fetch_claim_status,
 )
 
 # --------------------------------------------------
 # App Init
 # --------------------------------------------------
 
-app = FastAPI(title="Enterprise Insurance Claim System")
+app = FastAPI(title="Enterprise Insurance Claim System", default_response_class=ORJSONResponse)
 
 @app.on_event("startup")
 def startup():
@@ -51,10 +62,27 @@ class ManagerDecisionRequest(BaseModel):
     decision: str  # APPROVED / REJECTED
 
 
+_ALLOWED_DECISIONS: frozenset[str] = frozenset({"APPROVED", "REJECTED", "PENDING_DOCUMENTS"})
+
+
 # ==================================================
 # HELPER - Confirmation Message
 # ==================================================
 
+# Confirmation text, formatted once per registration with a single strftime
+_CONF_TMPL = (
+    "Thank you for registering your claim.\n\n"
+    "Your claim '{cid}' under policy '{pol}' "
+    "was successfully registered on {d} at {t}.\n\n"
+    "Your reference number for this transaction is:\n"
+    "{tx}\n\n"
+    "Our team will now validate and review your claim. "
+    "You can use this reference number to track the status anytime.\n\n"
+    "Thank you for choosing our insurance services."
+)
+_CONF_DT_FMT = "%B %d, %Y|%I:%M %p UTC"
+
+
 def generate_confirmation_message(
     claim_id: str,
     policy_number: str,
@@ -63,19 +91,8 @@ def generate_confirmation_message(
 ) -> str:
 
     dt = datetime.fromisoformat(registered_at)
-    formatted_date = dt.strftime("%B %d, %Y")
-    formatted_time = dt.strftime("%I:%M %p UTC")
-
-    return (
-        f"Thank you for registering your claim.\n\n"
-        f"Your claim '{claim_id}' under policy '{policy_number}' "
-        f"was successfully registered on {formatted_date} at {formatted_time}.\n\n"
-        f"Your reference number for this transaction is:\n"
-        f"{transaction_id}\n\n"
-        f"Our team will now validate and review your claim. "
-        f"You can use this reference number to track the status anytime.\n\n"
-        f"Thank you for choosing our insurance services."
-    )
+    d, t = dt.strftime(_CONF_DT_FMT).split("|", 1)
+    return _CONF_TMPL.format(cid=claim_id, pol=policy_number, d=d, t=t, tx=transaction_id)
 
 
 # ==================================================
@@ -96,8 +113,7 @@ async def register_claim(request: ClaimRegistrationRequest):
     )
 
     # Run only registration node (not full graph)
-    from backend.agents.registration_agent import registration_agent
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
     message = generate_confirmation_message(
         state.claim_id,
@@ -119,25 +135,25 @@ async def register_claim(request: ClaimRegistrationRequest):
 # CUSTOMER: CHECK STATUS
 # ==================================================
 
+# Polling UIs re-ask /claims/status constantly; let the browser/proxy collapse
+# duplicate polls within a second (the DB side is served by the status cache)
+_STATUS_CACHE_CONTROL = "private, max-age=1"
+
+
 @app.post("/claims/status")
-def check_status(request: ClaimStatusRequest):
+async def check_status(request: ClaimStatusRequest, response: Response):
 
-    claim, _ = fetch_claim_and_docs(request.transaction_id)
+    status = await async_fetch_claim_status(request.transaction_id)
 
-    if not claim:
+    if not status:
         raise HTTPException(
             status_code=404,
             detail="Transaction not found. Please check your reference number."
         )
 
-    return {
-        "transaction_id": claim["transaction_id"],
-        "claim_id": claim["claim_id"],
-        "policy_number": claim["policy_number"],
-        "status": claim["status"],
-        "registered_at": claim["registered_at"],
-        "final_decision": claim.get("final_decision")
-    }
+    del status["documents_uploaded"]
+    response.headers["Cache-Control"] = _STATUS_CACHE_CONTROL
+    return status
 
 
 # ==================================================
@@ -147,13 +163,13 @@ def check_status(request: ClaimStatusRequest):
 @app.post("/claims/manager/process/{transaction_id}")
 async def process_claim(transaction_id: str):
 
-    claim, docs = fetch_claim_and_docs(transaction_id)
+    claim, _ = await async_fetch_claim_and_docs(transaction_id)
 
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
-    # Rebuild state
-    state = ClaimState(
+    # Rebuild state (DB rows are already typed, so skip validation)
+    state = ClaimState.model_construct(
         transaction_id=claim["transaction_id"],
         claim_id=claim["claim_id"],
         customer_name=claim["customer_name"],
@@ -167,21 +183,22 @@ async def process_claim(transaction_id: str):
 
     final_state = await claim_graph_v3.ainvoke(state)
 
-    # Ensure dict
-    if not isinstance(final_state, dict):
-        final_state = final_state.model_dump()  
-    
-    
-   
-    
+    # Persist investigator assignment (no-op when nobody was assigned)
+    await async_update_claim_fields(
+        transaction_id,
+        **assignment_fields(
+            state_get(final_state, "assignment"),
+            utcnow_iso()
+        )
+    )
 
     return {
-        "transaction_id": final_state.get("transaction_id"),
-        "final_decision": final_state.get("final_decision"),
-        "fraud_score": final_state.get("fraud_score"),
-        "fraud_decision": final_state.get("fraud_decision"),
-        "validation": final_state.get("validation"),
-        "assignment": final_state.get("assignment"),
+        "transaction_id": state_get(final_state, "transaction_id"),
+        "final_decision": state_get(final_state, "final_decision"),
+        "fraud_score": state_get(final_state, "fraud_score"),
+        "fraud_decision": state_get(final_state, "fraud_decision"),
+        "validation": state_get(final_state, "validation"),
+        "assignment": state_get(final_state, "assignment"),
     }
 
 
@@ -191,24 +208,16 @@ async def process_claim(transaction_id: str):
 # ==================================================
 
 @app.post("/claims/manager/decision/{transaction_id}")
-def manager_decision(transaction_id: str, request: ManagerDecisionRequest):
-
-    claim, _ = fetch_claim_and_docs(transaction_id)
-
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+async def manager_decision(transaction_id: str, request: ManagerDecisionRequest):
 
     decision = request.decision.upper()
 
-    if decision not in ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]:
+    if decision not in _ALLOWED_DECISIONS:
         raise HTTPException(status_code=400, detail="Invalid decision")
 
-    update_claim_fields(
-        transaction_id,
-        final_decision=decision,
-        status=decision,
-        updated_at=datetime.now(timezone.utc).isoformat()
-    )
+    # UPDATE ... RETURNING: no row back means the claim doesn't exist
+    if await async_update_decision(transaction_id, decision, utcnow_iso()) is None:
+        raise HTTPException(status_code=404, detail="Claim not found")
 
     return {
         "transaction_id": transaction_id,
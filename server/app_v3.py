@@ -1,8 +1,14 @@
 # server/app_v2.py
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
-from datetime import datetime, timezone
+import asyncio
+import os
+import tempfile
+import uuid
+
+from fastapi import FastAPI, HTTPException, Response, UploadFile, File, Form, BackgroundTasks
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from datetime import datetime
 from typing import Optional, List
 
 # Graph
@@ -14,21 +20,32 @@ from backend.state.claim_state import ClaimState, DocumentRecord
 # DB
 from backend.db.sqlite_store import (
     init_db,
-    fetch_claim_and_docs,
-    update_claim_fields,
-    insert_documents,
+    persist_registration,
+    register_claims_bulk,
+    async_fetch_claim_and_docs,
+    async_update_claim_fields,
+    async_update_decision,
+    async_fetch_claim_status,
 )
 
+# Agents
+from backend.agents.registration_agent import registration_agent
+from backend.agents.investigator_agent import assignment_fields
+
 # Utils
-from backend.utils.ocr import ocr_any
+from backend.utils.ocr import ocr_any_path, new_content_hash, OCR_MAX_WORKERS, warm_up as ocr_warm_up
 from backend.utils.documents import classify_document
+from backend.utils.clock import utcnow_iso
+from backend.utils.state_builder import state_get
+from backend.utils.safe_json import json_loads, JSONDecodeError
+from backend.utils.logger import logger
 
 
 # --------------------------------------------------
 # App Init
 # --------------------------------------------------
 
-app = FastAPI(title="Enterprise Insurance Claim System")
+app = FastAPI(title="Enterprise Insurance Claim System", default_response_class=ORJSONResponse)
 
 
 @app.on_event("startup")
@@ -36,6 +53,12 @@ def startup():
     init_db()
     print("Database initialized.")
 
+    # Load the Tesseract engine now so the first upload doesn't pay for it
+    try:
+        ocr_warm_up()
+    except Exception as e:
+        print(f"[OCR] Warm-up skipped: {e}")
+
 
 # ==================================================
 # REQUEST MODELS
@@ -49,10 +72,37 @@ class ManagerDecisionRequest(BaseModel):
     decision: str  # APPROVED / REJECTED / PENDING_DOCUMENTS
 
 
+_ALLOWED_DECISIONS: frozenset[str] = frozenset({"APPROVED", "REJECTED", "PENDING_DOCUMENTS"})
+
+
+class BulkClaimItem(BaseModel):
+    claim_id: str
+    customer_name: str
+    policy_number: str
+    description: str
+    amount: float
+    claim_type: str
+    files: List[str] = []  # filenames of this claim's uploads in the multipart body
+
+
 # ==================================================
 # HELPER - Confirmation Message
 # ==================================================
 
+# Confirmation text, formatted once per registration with a single strftime
+_CONF_TMPL = (
+    "Thank you for registering your claim.\n\n"
+    "Your claim '{cid}' under policy '{pol}' "
+    "was successfully registered on {d} at {t}.\n\n"
+    "Your reference number for this transaction is:\n"
+    "{tx}\n\n"
+    "Our team will now validate and review your claim. "
+    "You can use this reference number to track the status anytime.\n\n"
+    "Thank you for choosing our insurance services."
+)
+_CONF_DT_FMT = "%B %d, %Y|%I:%M %p UTC"
+
+
 def generate_confirmation_message(
     claim_id: str,
     policy_number: str,
@@ -61,25 +111,72 @@ def generate_confirmation_message(
 ) -> str:
 
     dt = datetime.fromisoformat(registered_at)
-    formatted_date = dt.strftime("%B %d, %Y")
-    formatted_time = dt.strftime("%I:%M %p UTC")
-
-    return (
-        f"Thank you for registering your claim.\n\n"
-        f"Your claim '{claim_id}' under policy '{policy_number}' "
-        f"was successfully registered on {formatted_date} at {formatted_time}.\n\n"
-        f"Your reference number for this transaction is:\n"
-        f"{transaction_id}\n\n"
-        f"Our team will now validate and review your claim. "
-        f"You can use this reference number to track the status anytime.\n\n"
-        f"Thank you for choosing our insurance services."
-    )
+    d, t = dt.strftime(_CONF_DT_FMT).split("|", 1)
+    return _CONF_TMPL.format(cid=claim_id, pol=policy_number, d=d, t=t, tx=transaction_id)
 
 
 # ==================================================
 # CUSTOMER: REGISTER CLAIM (WITH DOCUMENTS)
 # ==================================================
 
+# Uploads are streamed to temp files in 1 MiB chunks (never held in memory
+# whole) and OCR'd from disk concurrently in worker threads (Tesseract
+# releases the GIL and runs single-threaded per call), at most
+# OCR_MAX_WORKERS at a time.
+_ocr_sem = asyncio.Semaphore(OCR_MAX_WORKERS)
+_SPOOL_CHUNK = 1 << 20
+
+
+def _spool_upload(file: UploadFile):
+    """Copy an upload to a temp file; returns (path, size, content hash)."""
+    h = new_content_hash()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename or "")[1]) as tmp:
+        for chunk in iter(lambda: file.file.read(_SPOOL_CHUNK), b""):
+            h.update(chunk)
+            tmp.write(chunk)
+        size = tmp.tell()
+    return tmp.name, size, h.hexdigest()
+
+
+async def _ocr_upload(file: UploadFile):
+    """Returns (size_bytes, extracted_text)."""
+    path, size, digest = await asyncio.to_thread(_spool_upload, file)
+    try:
+        async with _ocr_sem:
+            text = await asyncio.to_thread(
+                ocr_any_path,
+                path,
+                filename=file.filename,
+                content_type=file.content_type,
+                digest=digest
+            )
+    finally:
+        os.unlink(path)
+    return size, text
+
+
+async def _process_upload(file: UploadFile):
+    """OCR → classify → record for one upload; returns (DocumentRecord, doc_type)."""
+    size_bytes, extracted_text = await _ocr_upload(file)
+
+    # Document classification
+    doc_type = classify_document(
+        filename=file.filename,
+        content_type=file.content_type,
+        text=extracted_text
+    )
+
+    # Create structured document record
+    doc_record = DocumentRecord(
+        filename=file.filename,
+        content_type=file.content_type,
+        size_bytes=size_bytes,
+        doc_type=doc_type,
+        extracted_text=extracted_text
+    )
+    return doc_record, doc_type
+
+
 @app.post("/claims/register")
 async def register_claim(
     claim_id: str = Form(...),
@@ -91,6 +188,9 @@ async def register_claim(
     documents: List[UploadFile] = File(default=[])
 ):
 
+    # One timestamp per request: registered_at and the final updated_at
+    now = utcnow_iso()
+
     # Build initial state
     state = ClaimState(
         claim_id=claim_id,
@@ -99,66 +199,47 @@ async def register_claim(
         amount=amount,
         claim_type=claim_type,
         extracted_text=description,
+        registered_at=now,
     )
 
     # Run registration agent
-    from backend.agents.registration_agent import registration_agent
-    state = registration_agent(state)
+    state = await asyncio.to_thread(registration_agent, state)
 
-    combined_text = description or ""
+    # Pieces of the aggregated text, joined once after the loop
+    text_parts = [description or ""]
 
     # --------------------------------------------------
     # Process uploaded documents
     # --------------------------------------------------
-    for file in documents:
-        file_bytes = await file.read()
-
-        # OCR extraction
-        extracted_text = ocr_any(
-            uploaded_bytes=file_bytes,
-            filename=file.filename,
-            content_type=file.content_type
-        )
-
-        # Document classification
-        doc_type = classify_document(
-            filename=file.filename,
-            content_type=file.content_type,
-            text=extracted_text
-        )
-
-        # Create structured document record
-        doc_record = DocumentRecord(
-            filename=file.filename,
-            content_type=file.content_type,
-            size_bytes=len(file_bytes),
-            doc_type=doc_type,
-            extracted_text=extracted_text
-        )
+    # OCR + classification for all documents at once; each document is
+    # classified as soon as its own OCR finishes
+    results = await asyncio.gather(*(_process_upload(file) for file in documents))
 
+    doc_rows = []
+    for doc_record, doc_type in results:
         state.documents.append(doc_record)
 
         # Aggregate OCR text for AI validation context
-        combined_text += f"\n\n[DOCUMENT: {doc_type.upper()}]\n{extracted_text}"
-
-        # Persist document in DB
-    insert_documents(
-    state.transaction_id,
-    [{
-        "filename": file.filename,
-        "content_type": file.content_type,
-        "size_bytes": len(file_bytes),
-        "doc_type": doc_type,
-        "extracted_text": extracted_text
-    }]
-)
+        text_parts.append(f"\n\n[DOCUMENT: {doc_type.upper()}]\n{doc_record.extracted_text}")
 
-    # Store aggregated extracted text
-    update_claim_fields(
+        doc_rows.append({
+            "filename": doc_record.filename,
+            "content_type": doc_record.content_type,
+            "size_bytes": doc_record.size_bytes,
+            "doc_type": doc_type,
+            "extracted_text": doc_record.extracted_text
+        })
+
+    combined_text = "".join(text_parts)
+
+    # Persist every document and the aggregated extracted text in one transaction
+    await asyncio.to_thread(
+        persist_registration,
         state.transaction_id,
+        doc_rows,
         extracted_text=combined_text,
         status="REGISTERED",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        updated_at=now
     )
 
     state.extracted_text = combined_text
@@ -180,46 +261,134 @@ async def register_claim(
     }
 
 
+# ==================================================
+# CUSTOMER: BULK REGISTER CLAIMS
+# ==================================================
+
+def _parse_manifest(manifest: str) -> List[BulkClaimItem]:
+    try:
+        items = json_loads(manifest)
+        if not isinstance(items, list):
+            raise ValueError("manifest must be a JSON list")
+        return [BulkClaimItem(**item) for item in items]
+    except (JSONDecodeError, ValueError, TypeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {e}")
+
+
+@app.post("/claims/register/bulk")
+async def bulk_register_claims(
+    manifest: str = Form(...),
+    documents: List[UploadFile] = File(default=[])
+):
+    """
+    Register many claims in one request. `manifest` is a JSON list of claims,
+    each naming its uploads by filename; every upload is OCR'd once however
+    many claims reference it, and all rows are written in one transaction.
+    """
+    items = _parse_manifest(manifest)
+
+    # The manifest refers to uploads by filename, so names must be unique
+    # (identical contents under different names are still OCR'd once, via
+    # the OCR content-hash cache)
+    uploads = {}
+    for file in documents:
+        if file.filename in uploads:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Duplicate upload filename: {file.filename!r}"
+            )
+        uploads[file.filename] = file
+    for item in items:
+        missing = [name for name in item.files if name not in uploads]
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Claim '{item.claim_id}' references missing files: {missing}"
+            )
+
+    # OCR + classification for every distinct upload at once
+    names = list(uploads)
+    results = dict(zip(names, await asyncio.gather(*(_process_upload(uploads[n]) for n in names))))
+
+    now = utcnow_iso()
+    entries = []
+    for item in items:
+        text_parts = [item.description or ""]
+        doc_rows = []
+        for name in item.files:
+            doc_record, doc_type = results[name]
+            text_parts.append(f"\n\n[DOCUMENT: {doc_type.upper()}]\n{doc_record.extracted_text}")
+            doc_rows.append({
+                "filename": doc_record.filename,
+                "content_type": doc_record.content_type,
+                "size_bytes": doc_record.size_bytes,
+                "doc_type": doc_type,
+                "extracted_text": doc_record.extracted_text
+            })
+
+        entries.append((
+            dict(
+                transaction_id=str(uuid.uuid4()),
+                claim_id=item.claim_id,
+                customer_name=item.customer_name,
+                policy_number=item.policy_number,
+                amount=item.amount,
+                claim_type=item.claim_type,
+                extracted_text="".join(text_parts),
+                registered_at=now,
+                status="REGISTERED",
+            ),
+            doc_rows
+        ))
+
+    # One writer transaction for the whole batch
+    await asyncio.to_thread(register_claims_bulk, entries)
+
+    return {
+        "registered_at": now,
+        "claims": [
+            {"claim_id": reg["claim_id"], "transaction_id": reg["transaction_id"]}
+            for reg, _ in entries
+        ]
+    }
+
+
 # ==================================================
 # CUSTOMER: CHECK STATUS
 # ==================================================
 
+# Polling UIs re-ask /claims/status constantly; let the browser/proxy collapse
+# duplicate polls within a second (the DB side is served by the status cache)
+_STATUS_CACHE_CONTROL = "private, max-age=1"
+
+
 @app.post("/claims/status")
-def check_status(request: ClaimStatusRequest):
+async def check_status(request: ClaimStatusRequest, response: Response):
 
-    claim, docs = fetch_claim_and_docs(request.transaction_id)
+    status = await async_fetch_claim_status(request.transaction_id)
 
-    if not claim:
+    if not status:
         raise HTTPException(
             status_code=404,
             detail="Transaction not found. Please check your reference number."
         )
 
-    return {
-        "transaction_id": claim["transaction_id"],
-        "claim_id": claim["claim_id"],
-        "policy_number": claim["policy_number"],
-        "status": claim["status"],
-        "registered_at": claim["registered_at"],
-        "final_decision": claim.get("final_decision"),
-        "documents_uploaded": len(docs) if docs else 0
-    }
+    response.headers["Cache-Control"] = _STATUS_CACHE_CONTROL
+    return status
 
 
 # ==================================================
 # MANAGER: RUN FULL AI FLOW
 # ==================================================
 
-@app.post("/claims/manager/process/{transaction_id}")
-async def process_claim(transaction_id: str):
-
-    claim, docs = fetch_claim_and_docs(transaction_id)
+async def _load_claim_state(transaction_id: str) -> ClaimState:
+    claim, _ = await async_fetch_claim_and_docs(transaction_id)
 
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
-    # Rebuild state
-    state = ClaimState(
+    # Rebuild state (DB rows are already typed, so skip validation)
+    return ClaimState.model_construct(
         transaction_id=claim["transaction_id"],
         claim_id=claim["claim_id"],
         customer_name=claim["customer_name"],
@@ -231,55 +400,86 @@ async def process_claim(transaction_id: str):
         registered_at=claim["registered_at"],
     )
 
+
+async def _run_graph_and_persist(state: ClaimState) -> dict:
+    transaction_id = state.transaction_id
+
     # Run full AI graph
     final_state = await claim_graph_v3.ainvoke(state)
 
-    if not isinstance(final_state, dict):
-        final_state = final_state.model_dump()
-
-    # Persist AI results in DB
-    update_claim_fields(
+    # Persist AI results in DB (single write, including investigator assignment)
+    now = utcnow_iso()
+    await async_update_claim_fields(
         transaction_id,
-        final_decision=final_state.get("final_decision"),
-        fraud_score=final_state.get("fraud_score"),
-        fraud_decision=final_state.get("fraud_decision"),
-        status=final_state.get("final_decision") or "UNDER_REVIEW",
-        updated_at=datetime.now(timezone.utc).isoformat()
+        **assignment_fields(state_get(final_state, "assignment"), now),
+        final_decision=state_get(final_state, "final_decision"),
+        fraud_score=state_get(final_state, "fraud_score"),
+        fraud_decision=state_get(final_state, "fraud_decision"),
+        status=state_get(final_state, "final_decision") or "UNDER_REVIEW",
+        updated_at=now
     )
 
     return {
         "transaction_id": transaction_id,
-        "final_decision": final_state.get("final_decision"),
-        "fraud_score": final_state.get("fraud_score"),
-        "fraud_decision": final_state.get("fraud_decision"),
-        "validation": final_state.get("validation"),
-        "assignment": final_state.get("assignment"),
+        "final_decision": state_get(final_state, "final_decision"),
+        "fraud_score": state_get(final_state, "fraud_score"),
+        "fraud_decision": state_get(final_state, "fraud_decision"),
+        "validation": state_get(final_state, "validation"),
+        "assignment": state_get(final_state, "assignment"),
     }
 
 
+async def _run_graph_in_background(state: ClaimState):
+    try:
+        await _run_graph_and_persist(state)
+    except Exception as e:
+        logger.error("[process] background run failed tx=%s: %s: %s", state.transaction_id, type(e).__name__, e)
+        await async_update_claim_fields(
+            state.transaction_id,
+            status="PROCESSING_FAILED",
+            updated_at=utcnow_iso()
+        )
+
+
+@app.post("/claims/manager/process/{transaction_id}")
+async def process_claim(transaction_id: str):
+
+    state = await _load_claim_state(transaction_id)
+    return await _run_graph_and_persist(state)
+
+
+# Non-blocking variant: returns at once and runs the graph after the response;
+# poll /claims/status until the status leaves PROCESSING
+@app.post("/claims/manager/process/{transaction_id}/start", status_code=202)
+async def start_process_claim(transaction_id: str, background: BackgroundTasks):
+
+    state = await _load_claim_state(transaction_id)
+
+    await async_update_claim_fields(
+        transaction_id,
+        status="PROCESSING",
+        updated_at=utcnow_iso()
+    )
+    background.add_task(_run_graph_in_background, state)
+
+    return {"transaction_id": transaction_id, "status": "PROCESSING"}
+
+
 # ==================================================
 # MANAGER: FINAL DECISION (Human Override)
 # ==================================================
 
 @app.post("/claims/manager/decision/{transaction_id}")
-def manager_decision(transaction_id: str, request: ManagerDecisionRequest):
-
-    claim, _ = fetch_claim_and_docs(transaction_id)
-
-    if not claim:
-        raise HTTPException(status_code=404, detail="Claim not found")
+async def manager_decision(transaction_id: str, request: ManagerDecisionRequest):
 
     decision = request.decision.upper()
 
-    if decision not in ["APPROVED", "REJECTED", "PENDING_DOCUMENTS"]:
+    if decision not in _ALLOWED_DECISIONS:
         raise HTTPException(status_code=400, detail="Invalid decision")
 
-    update_claim_fields(
-        transaction_id,
-        final_decision=decision,
-        status=decision,
-        updated_at=datetime.now(timezone.utc).isoformat()
-    )
+    # UPDATE ... RETURNING: no row back means the claim doesn't exist
+    if await async_update_decision(transaction_id, decision, utcnow_iso()) is None:
+        raise HTTPException(status_code=404, detail="Claim not found")
 
     return {
         "transaction_id": transaction_id,
@@ -1,21 +1,26 @@
 import sqlite3
 import os
+from contextlib import closing
 
 DB_PATH = os.path.join("data", "investigators.db")
 
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
 
-# Show tables
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-print("Tables:")
-for row in cursor.fetchall():
-    print(row)
+def main():
+    with closing(sqlite3.connect(DB_PATH)) as conn:
+        cursor = conn.cursor()
 
-# Show columns of investigators table
-cursor.execute("PRAGMA table_info(investigators);")
-print("\nColumns in investigators table:")
-for col in cursor.fetchall():
-    print(col)
+        # Show tables
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        print("Tables:")
+        for row in cursor.fetchall():
+            print(row)
 
-conn.close()
+        # Show columns of investigators table
+        cursor.execute("PRAGMA table_info(investigators);")
+        print("\nColumns in investigators table:")
+        for col in cursor.fetchall():
+            print(col)
+
+
+if __name__ == "__main__":
+    main()